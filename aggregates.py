@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+import perf
+from data_loader import MONTHS, fmt_column
+from investors import CoInvestmentGraph
+
+# Aggregates behind the Overall Analysis page. Each one is a pure function of
+# the filtered frame returning a small result; results are memoized per filter
+# selection in a process-wide LRU, so reruns, page switches and other sessions
+# with the same filters reuse them. Results are shared: treat them as read-only.
+MAX_ENTRIES    = 512
+HIST_BINS      = 40
+CATEGORY_ORDER = ["Small","Medium","Large","Very Large"]
+DEAL_COLUMNS   = ["Date","Startup","Industry","City","Funding_Round","Investors","Amount"]
+
+_cache = OrderedDict()
+_stats = {}
+_lock  = threading.Lock()
+
+
+def memoized(fn):
+    """Cache ``fn(df)`` under ``(fn, key)``; ``key=None`` always recomputes."""
+    name = f"{fn.__module__}.{fn.__name__}"
+    _stats[name] = {"hits": 0, "misses": 0}
+
+    @wraps(fn)
+    def wrapper(df, key=None):
+        if not perf.active():
+            return cached(df, key)[0]
+        t0 = time.perf_counter()
+        result, hit = cached(df, key)
+        perf.record(name, (time.perf_counter() - t0) * 1000, rows=len(df), cached=hit)
+        return result
+
+    def cached(df, key):
+        if key is None:
+            return fn(df), False
+        ck = (name, key)
+        with _lock:
+            if ck in _cache:
+                _cache.move_to_end(ck)
+                _stats[name]["hits"] += 1
+                return _cache[ck], True
+        result = fn(df)
+        with _lock:
+            _stats[name]["misses"] += 1
+            _cache[ck] = result
+            while len(_cache) > MAX_ENTRIES:
+                _cache.popitem(last=False)
+        return result, False
+    return wrapper
+
+
+def cache_stats():
+    """Hit/miss counters per aggregate."""
+    with _lock:
+        stats = pd.DataFrame.from_dict(_stats, orient="index")
+    stats["hit_rate"] = (stats["hits"] / (stats["hits"] + stats["misses"])).fillna(0).round(3)
+    return stats
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        for s in _stats.values():
+            s["hits"] = s["misses"] = 0
+
+
+def _sum_by(df, col):
+    return df.groupby(col, observed=True)["Amount"].sum()
+
+
+def _counts(s):
+    return ranked(s.value_counts().loc[lambda c: c > 0])
+
+
+def ranked(s, n=None):
+    """Largest-first with ties broken by label, so top-N cut-offs are deterministic."""
+    s = s.sort_index().sort_values(ascending=False, kind="stable")
+    return s if n is None else s.head(n)
+
+
+@memoized
+def kpis(df):
+    return {
+        "period_start":  df["Date"].min().strftime("%b %Y"),
+        "period_end":    df["Date"].max().strftime("%b %Y"),
+        "records":       len(df),
+        "total_funding": float(df["Amount"].sum()),
+        "startups":      int(df["Startup"].nunique()),
+        "industries":    int(df["Industry"].nunique()),
+        "cities":        int(df["City"].nunique()),
+    }
+
+
+@memoized
+def industry_funding(df):
+    return ranked(_sum_by(df, "Industry"), 12)
+
+
+@memoized
+def city_funding(df):
+    return ranked(_sum_by(df, "City"), 10)
+
+
+@memoized
+def city_deals(df):
+    return _counts(df["City"]).head(10)
+
+
+@memoized
+def category_counts(df):
+    return _counts(df["Funding_Category"])
+
+
+@memoized
+def round_counts(df):
+    return _counts(df["Funding_Round"])
+
+
+@memoized
+def top_startups(df):
+    return ranked(_sum_by(df, "Startup"), 15)
+
+
+def histogram(values, bins):
+    """Pre-binned histogram: one row per bin with lo/hi edges and a count."""
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({"lo": edges[:-1], "hi": edges[1:], "count": counts})
+
+
+@memoized
+def deal_size_hist(df):
+    """Histogram of log10 deal sizes (zero amounts excluded)."""
+    nonzero = df.loc[df["Amount"] > 0, "Amount"]
+    return histogram(np.log10(nonzero), HIST_BINS)
+
+
+@memoized
+def category_funding(df):
+    cat_amt = _sum_by(df, "Funding_Category")
+    return cat_amt.reindex([c for c in CATEGORY_ORDER if c in cat_amt.index])
+
+
+@memoized
+def yoy(df):
+    return df.groupby("Year").agg(
+        Total=("Amount","sum"),
+        Deals=("Amount","count"),
+        AvgDeal=("Amount","mean"),
+        Startups=("Startup","nunique")
+    ).reset_index()
+
+
+@memoized
+def stage_by_year(df):
+    return (df.groupby(["Year","Funding_Round"], observed=True)["Amount"].sum()
+              .unstack(fill_value=0))
+
+
+@memoized
+def cumulative_funding(df):
+    monthly = _sum_by(df, "YearMonth").reset_index().sort_values("YearMonth")
+    monthly["Cumulative"] = monthly["Amount"].cumsum()
+    return monthly
+
+
+@memoized
+def monthly_pattern(df):
+    by_month = _sum_by(df, "Month_Name")
+    return by_month.reindex([m for m in MONTHS if m in by_month.index])
+
+
+@memoized
+def industry_bubble(df):
+    return df.groupby("Industry", observed=True).agg(
+        TotalFunding=("Amount","sum"),
+        DealCount=("Amount","count"),
+        AvgDeal=("Amount","mean")
+    ).reset_index().sort_values("TotalFunding", ascending=False).head(20)
+
+
+@memoized
+def investor_power(df):
+    """Top 15 investors by average power score, each member of a syndicate on its own.
+
+    Builds a co-investment graph of ``df``; pages pass the dataset's cached one instead.
+    """
+    return CoInvestmentGraph(df).ranking()
+
+
+@memoized
+def month_year_heatmap(df):
+    heatmap_data = df.pivot_table(
+        index="Month_Name", columns="Year",
+        values="Amount", aggfunc="sum", observed=True
+    ).fillna(0)
+    return heatmap_data.reindex([m for m in MONTHS if m in heatmap_data.index])
+
+
+@memoized
+def largest_deals(df):
+    """The 10 largest deals, unformatted."""
+    return df.nlargest(10,"Amount")[DEAL_COLUMNS]
+
+
+@memoized
+def top_deals(df):
+    top10 = largest_deals(df, df.attrs.get("filter_key")).copy()
+    top10["Amount_fmt"] = fmt_column(top10["Amount"])
+    top10["Date"] = top10["Date"].dt.date
+    return top10.drop(columns=["Amount"]).rename(columns={"Amount_fmt":"Amount"})
@@ -0,0 +1,272 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import perf
+import refresh
+
+# Local JSON API over the dashboard's aggregates, for tools that would
+# otherwise scrape the pages or redo the pandas work. GET /api/<name> takes
+# the sidebar filters as query parameters (year, industry, city, round; round
+# may repeat) and answers from the same caches as the pages: the served data
+# version, filter index, cube, memoized aggregates and investor graph. Bodies
+# are cached per (data version, request) and carry an ETag, so a poll with
+# If-None-Match costs a dictionary lookup and an empty 304. Run it with
+# `python api.py`, or alongside the app with DASH_API_PORT set.
+API_PORT      = int(os.environ.get("DASH_API_PORT", "0"))
+API_HOST      = os.environ.get("DASH_API_HOST", "127.0.0.1")
+MAX_RESPONSES = 256
+DEAL_LIMIT    = 100
+PARAMS        = {"year", "industry", "city", "round", "name", "limit"}
+
+_responses = OrderedDict()
+_lock      = threading.Lock()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Query:
+    """One request: the full frame, its filtered slice and where to roll up from."""
+
+    def __init__(self, df, params):
+        import aggregates as agg
+        import cube as cb
+        from filters import filter_frame, get_filter_index
+        self.df, self.params = df, params
+        index = get_filter_index(df)
+        year     = self._choice("year", index.options["Year"])
+        industry = self._choice("industry", index.options["Industry"])
+        city     = self._choice("city", index.options["City"])
+        rounds   = params.get("round", index.options["Funding_Round"])   # all, as the sidebar's default
+        for r in rounds:
+            if r not in index.lookup["Funding_Round"]:
+                raise ApiError(400, f"unknown round {r!r}")
+        self.filters = {"year": year, "industry": industry, "city": city, "rounds": sorted(rounds)}
+        self.fdf = filter_frame(df, year, industry, city, rounds, index=index)
+        self.key = self.fdf.attrs.get("filter_key")
+        # Roll up from the cube when the selection is known, as the overview does.
+        if self.key is not None:
+            self.src, self.data = cb, cb.slice_cube(cb.get_cube(df), *self.key[1:])
+        else:
+            self.src, self.data = agg, self.fdf
+
+    def _choice(self, name, options):
+        value = self.param(name, "All")
+        if value == "All":
+            return value
+        for option in options:
+            if str(option) == value:
+                return option
+        raise ApiError(400, f"unknown {name} {value!r}")
+
+    def param(self, name, default=None):
+        values = self.params.get(name)
+        return default if not values else values[-1]
+
+    def rollup(self, name):
+        return getattr(self.src, name)(self.data, self.key)
+
+
+def _investor(q):
+    from investors import get_investor_graph, get_investor_index, portfolio
+    name = q.param("name")
+    if not name:
+        raise ApiError(400, "missing name")
+    try:
+        limit = int(q.param("limit", DEAL_LIMIT))
+    except ValueError:
+        raise ApiError(400, f"bad limit {q.param('limit')!r}")
+    index = get_investor_index(q.df)
+    if index.code(name) is None:
+        raise ApiError(404, f"unknown investor {name!r}")
+    deals = index.rows(q.fdf, name)
+    out = {"investor": index.names[index.code(name)], "deals": len(deals)}
+    if len(deals):
+        out.update(portfolio(deals))
+        out["co_investors"] = get_investor_graph(q.df).co_investors(name, q.fdf).head(limit)
+        out["recent_deals"] = deals.sort_values("Date", ascending=False, kind="stable").head(limit)
+    return out
+
+
+def _investors(q):
+    from investors import get_investor_index
+    return get_investor_index(q.df).names_in(q.fdf)
+
+
+def _investor_ranking(q):
+    from investors import get_investor_graph
+    return get_investor_graph(q.df).ranking(q.fdf)
+
+
+def _top_deals(q):
+    import aggregates as agg
+    return agg.largest_deals(q.fdf, q.key)
+
+
+ENDPOINTS = {   # name: (q -> result, description)
+    "kpis":             (lambda q: q.rollup("kpis"),             "Period, records, total funding, distinct counts"),
+    "industry_funding": (lambda q: q.rollup("industry_funding"), "Funding of the 12 largest industries"),
+    "city_funding":     (lambda q: q.rollup("city_funding"),     "Funding of the 10 largest cities"),
+    "city_deals":       (lambda q: q.rollup("city_deals"),       "Deal counts of the 10 busiest cities"),
+    "round_counts":     (lambda q: q.rollup("round_counts"),     "Deal counts per funding round"),
+    "top_startups":     (lambda q: q.rollup("top_startups"),     "Funding of the 15 best-funded startups"),
+    "yoy":              (lambda q: q.rollup("yoy"),              "Funding, deals, average deal and startups per year"),
+    "top_deals":        (_top_deals,                             "The 10 largest deals"),
+    "investor_ranking": (_investor_ranking,                      "Top 15 investors by average power score"),
+    "investors":        (_investors,                             "Investor names in the selection"),
+    "investor":         (_investor,                              "Portfolio of investor `name` (`limit` rows of deals)"),
+}
+
+
+def _jsonable(value):
+    """Plain JSON types for aggregate results (frames and series become records)."""
+    if isinstance(value, pd.Series):
+        value = value.rename(value.name or "value").rename_axis(value.index.name or "label").reset_index()
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records", date_format="iso"))
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _body(name, params, inputs):
+    if name not in ENDPOINTS:
+        raise ApiError(404, f"unknown endpoint {name!r}; GET /api lists them")
+    df = refresh.load(inputs)
+    q  = Query(df, params)
+    result = ENDPOINTS[name][0](q)
+    return {"version": df.attrs.get("version"), "filters": q.filters, "rows": len(q.fdf),
+            "data": _jsonable(result)}
+
+
+def respond(path, query):
+    """(ETag, JSON bytes) for a GET of ``path``; cached per served data version."""
+    params = parse_qs(query, keep_blank_values=True)
+    unknown = set(params) - PARAMS
+    if unknown:
+        raise ApiError(400, f"unknown parameters: {', '.join(sorted(unknown))}")
+    name = path.rstrip("/").removeprefix("/api").lstrip("/")
+    if not name:
+        return None, json.dumps({n: d for n, (_, d) in ENDPOINTS.items()}, indent=1).encode()
+    inputs = refresh.served()
+    key = (name, tuple(sorted((k, tuple(v)) for k, v in params.items())), inputs)
+    with perf.stage(f"api {name}") as s:
+        with _lock:
+            hit = _responses.get(key)
+            if hit is not None:
+                _responses.move_to_end(key)
+        s.note(cached=hit is not None)
+        if hit is not None:
+            return hit
+        body = json.dumps(_body(name, params, inputs), default=str).encode()
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        with _lock:
+            _responses[key] = etag, body
+            while len(_responses) > MAX_RESPONSES:
+                _responses.popitem(last=False)
+        s.note(bytes=len(body))
+    return etag, body
+
+
+def _matches(etag, header):
+    if etag is None or not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, for pollers
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")   # revalidate with If-None-Match
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            if not (url.path == "/api" or url.path.startswith("/api/")):
+                raise ApiError(404, "not found; GET /api lists the endpoints")
+            etag, body = respond(url.path, url.query)
+        except ApiError as e:
+            return self._send(e.status, json.dumps({"error": str(e)}).encode())
+        except Exception as e:
+            return self._send(500, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode())
+        if _matches(etag, self.headers.get("If-None-Match")):
+            self._send(304, b"", etag)
+        else:
+            self._send(200, body, etag)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=API_HOST, port=API_PORT):
+    """A started server thread on ``host:port`` (None if the port is taken)."""
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="dash-api", daemon=True).start()
+    return server
+
+
+@st.cache_resource
+def start():
+    """Serve the API from this server process if DASH_API_PORT is set.
+
+    With several processes on one host, the first to bind the port serves it.
+    """
+    return serve() if API_PORT else None
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Serve the dashboard's aggregates as JSON.")
+    p.add_argument("--host", default=API_HOST)
+    p.add_argument("--port", type=int, default=API_PORT or 8502)
+    args = p.parse_args(argv)
+    import warmup
+    refresh.start()
+    warmup.warm_caches(refresh.load())
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"Serving http://{args.host}:{args.port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
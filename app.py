@@ -1,9 +1,9 @@
+import os
+
 import streamlit as st
-from data_loader import load_data
-from filters import apply_filters
-from analysis import load_overall_analysis
-from startup_view import load_startup_details
-from investor_view import load_investor_details
+import perf
+from data_loader import PARTITIONED
+from filters import apply_filters, select_year
 
 st.set_page_config(
     layout="wide",
@@ -26,9 +26,44 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load & filter
-df = load_data()
-filtered_df = apply_filters(df)
+perf.begin_run()
+
+# Background work, started once per server process; each module is imported
+# where it is started, and the JSON API only when it is enabled.
+import refresh
+import warmup
+refresh.start()
+warm_timings = warmup.start()
+if os.environ.get("DASH_API_PORT"):
+    import api
+    api.start()
+
+# Load & filter (the version the refresh watcher last published)
+if PARTITIONED:
+    # Read only the partition the Year filter needs.
+    year = select_year(refresh.years())
+    with perf.stage("load_data") as s:
+        df = refresh.load(years=None if year == "All" else (year,))
+        s.note(rows=len(df))
+    with perf.stage("apply_filters") as s:
+        filtered_df = apply_filters(df, year=year)
+        s.note(rows=len(filtered_df))
+else:
+    with perf.stage("load_data") as s:
+        df = refresh.load()
+        s.note(rows=len(df))
+    with perf.stage("apply_filters") as s:
+        filtered_df = apply_filters(df)
+        s.note(rows=len(filtered_df))
+
+# Rows clean() dropped for want of a date, as counted when the data was parsed.
+dates    = (df.attrs.get("parse_report") or {}).get("dates", {})
+rejected = dates.get("rejected", 0)
+missing  = dates.get("missing", 0)
+if rejected or missing:
+    st.sidebar.warning(f"{rejected + missing:,} rows dropped "
+                       f"({rejected:,} unparseable, {missing:,} missing dates)")
+refresh.status(df)
 
 # Navigation
 with st.sidebar:
@@ -38,36 +73,62 @@ with st.sidebar:
         "", ["Overall Analysis", "Startup POV", "Investor POV"]
     )
 
-if option == "Overall Analysis":
-    load_overall_analysis(filtered_df)
+perf.set_page(option)
 
-elif option == "Startup POV":
-    with st.sidebar:
-        st.markdown("### Search Startup")
-        search = st.text_input("Type to search...", "")
-    startup_list = sorted(filtered_df["Startup"].unique())
-    if search:
-        startup_list = [s for s in startup_list if search.lower() in s.lower()]
-    if not startup_list:
-        st.warning("No startups found.")
-    else:
+# Page modules are imported when their page is first shown.
+with perf.stage("page"):
+    if option == "Overall Analysis":
+        from analysis import load_overall_analysis
+        from cube import get_cube
+        from investors import get_investor_graph
+        from report import find_bundle, show_bundle
+        from sketches import APPROX, get_sketches
+        bundle = find_bundle(df, filtered_df)
+        if bundle:
+            show_bundle(bundle, filtered_df)
+        else:
+            load_overall_analysis(filtered_df, cube=get_cube(df), graph=get_investor_graph(df),
+                                  sketches=get_sketches(df) if APPROX else None)
+
+    elif option == "Startup POV":
+        from search import get_search_index
+        from startup_view import load_startup_details
+        from startups import get_startup_index
         with st.sidebar:
-            startup = st.selectbox("Select Startup", startup_list)
-        load_startup_details(filtered_df, startup)
+            st.markdown("### Search Startup")
+            search = st.text_input("Type to search...", "")
+        st_index = get_startup_index(df)
+        index = get_search_index(df, "Startup")
+        allowed = index.restrict(st_index.names_in(filtered_df), key=filtered_df.attrs.get("filter_key"))
+        startup_list = index.search(search, mask=allowed)
+        if not search and index.count(allowed) > len(startup_list):
+            st.sidebar.caption(f"First {len(startup_list)} of {index.count(allowed):,} startups; type to narrow.")
+        if not startup_list:
+            st.warning("No startups found.")
+        else:
+            with st.sidebar:
+                startup = st.selectbox("Select Startup", startup_list)
+            load_startup_details(filtered_df, startup, index=st_index)
 
-elif option == "Investor POV":
-    with st.sidebar:
-        st.markdown("### Search Investor")
-        search = st.text_input("Type to search...", "")
-    inv_list = sorted(
-        filtered_df["Investors"].str.split(",").explode()
-        .str.strip().str.strip('"').dropna().unique()
-    )
-    if search:
-        inv_list = [i for i in inv_list if search.lower() in i.lower()]
-    if not inv_list:
-        st.warning("No investors found.")
-    else:
+    elif option == "Investor POV":
+        from investor_view import load_investor_details
+        from investors import get_investor_graph, get_investor_index
+        from search import get_search_index
         with st.sidebar:
-            investor = st.selectbox("Select Investor", inv_list)
-        load_investor_details(filtered_df, investor)
+            st.markdown("### Search Investor")
+            search = st.text_input("Type to search...", "")
+        inv_index = get_investor_index(df)
+        index = get_search_index(df, "Investors")
+        allowed = index.restrict(inv_index.names_in(filtered_df), key=filtered_df.attrs.get("filter_key"))
+        inv_list = index.search(search, mask=allowed)
+        if not search and index.count(allowed) > len(inv_list):
+            st.sidebar.caption(f"First {len(inv_list)} of {index.count(allowed):,} investors; type to narrow.")
+        if not inv_list:
+            st.warning("No investors found.")
+        else:
+            with st.sidebar:
+                investor = st.selectbox("Select Investor", inv_list)
+            load_investor_details(filtered_df, investor, index=inv_index,
+                                  graph=get_investor_graph(df))
+
+perf.panel(startup=warm_timings)
@@ -0,0 +1,403 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit
+
+import data_loader
+
+# Headless benchmark of load -> filter -> overview -> startup/investor pages on
+# synthetic datasets generated from StartUp.csv at N times its size. Streamlit
+# elements are replaced by no-op stubs (widgets return their defaults), so the
+# numbers are the dashboard's own work: data loading, indexes, aggregates and
+# chart rendering. Results can be stored as a baseline and checked against it.
+BENCH_DIR = ".bench"
+BASELINE  = "bench_baseline.json"
+SCALES    = [10, 100, 1000]
+TOLERANCE = 0.5                        # allowed relative slowdown / memory growth
+NOISE     = {"wall_s": 0.05, "peak_mb": 5, "rss_mb": 5}   # absolute differences never flagged
+# Modules each step of a cold start imports, in the order the app imports them.
+IMPORT_STAGES = [
+    ("startup",            ["streamlit", "perf", "data_loader", "filters", "refresh", "warmup"]),
+    ("Overall Analysis",   ["analysis", "cube", "sketches", "report"]),
+    ("Startup POV",        ["search", "startup_view", "startups"]),
+    ("Investor POV",       ["investor_view", "investors"]),
+    ("matplotlib backend", ["matplotlib.figure", "matplotlib.ticker"]),
+    ("heatmap",            ["seaborn"]),
+]
+
+
+# Streamlit stubs
+class _Stop(Exception):
+    pass
+
+
+class _Stub:
+    """Stand-in for ``st``, ``st.sidebar``, columns and expanders."""
+
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, *a, **k):
+        return [_Stub() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def expander(self, *a, **k):
+        return _Stub()
+
+    def empty(self, *a, **k):
+        return _Stub()
+
+    def selectbox(self, label, options, index=0, *a, **k):
+        options = list(options)
+        return options[index] if options else None
+
+    def multiselect(self, label, options, default=None, *a, **k):
+        return list(default or [])
+
+    def text_input(self, label, value="", *a, **k):
+        return value
+
+    def number_input(self, label, min_value=None, max_value=None, value="min", *a, **k):
+        return min_value if value == "min" else value
+
+    def toggle(self, label, value=False, *a, **k):
+        return value
+
+    def radio(self, label, options, index=0, *a, **k):
+        return list(options)[index]
+
+    def button(self, *a, **k):
+        return False
+
+    def stop(self):
+        raise _Stop
+
+
+STUBBED = ["title", "subheader", "markdown", "write", "metric", "columns", "expander", "empty",
+           "image", "dataframe", "download_button", "info", "warning", "error", "success", "caption",
+           "selectbox", "multiselect", "text_input", "number_input", "toggle", "radio", "button", "stop",
+           "set_page_config", "sidebar", "vega_lite_chart"]
+
+
+@contextlib.contextmanager
+def headless():
+    """Replace Streamlit elements with stubs for the duration of the block."""
+    stub, saved = _Stub(), {name: getattr(streamlit, name) for name in STUBBED}
+    for name in STUBBED:
+        setattr(streamlit, name, stub if name == "sidebar" else getattr(stub, name))
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(streamlit, name, value)
+
+
+# Synthetic data
+def synthetic(scale, source=data_loader.DATA_PATH, out_dir=BENCH_DIR, seed=0):
+    """CSV with ``scale`` copies of ``source`` (startups renamed and amounts jittered per copy)."""
+    path = os.path.join(out_dir, f"startup-x{scale}.csv")
+    if os.path.exists(path):
+        return path
+    os.makedirs(out_dir, exist_ok=True)
+    raw = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    tmp = path + ".tmp"
+    for r in range(scale):
+        part = raw.copy()
+        if r:
+            part["Startup Name"] = part["Startup Name"].astype(str) + f" {r}"
+            jitter = rng.lognormal(0, 0.25, len(part))
+            part["Amount in USD"] = (pd.to_numeric(part["Amount in USD"], errors="coerce")
+                                     * jitter).round()
+        part.to_csv(tmp, mode="a", header=r == 0, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+# Stages
+def _figures():
+    import charts
+    t = charts.render_timings()
+    return len(t), int(t["cached"].sum())
+
+
+def stages(path, snapshot_dir, compact_schema=False):
+    """(name, callable) per stage, run in order on shared state."""
+    import analysis, filters, startup_view, investor_view
+    from cube import get_cube
+    from investors import get_investor_graph, get_investor_index
+    from sketches import APPROX, get_sketches
+    from startups import get_startup_index
+
+    state = {}
+
+    def read_csv():
+        state["raw"] = pd.read_csv(path)
+
+    def parse():
+        data_loader.clean(state.pop("raw"))
+
+    def load():
+        state["df"] = data_loader.read_dataset(path, snapshot_dir, compact_schema)
+
+    def load_snapshot():
+        state["df"] = data_loader.read_dataset(path, snapshot_dir, compact_schema)
+
+    def filter_():
+        df = state["df"]
+        state["fdf"] = filters.apply_filters(df)
+        top_city = df["City"].value_counts().index[0]
+        state["city"] = filters.filter_frame(df, city=top_city)
+
+    def overall():
+        analysis.load_overall_analysis(state["fdf"], cube=get_cube(state["df"]),
+                                       graph=get_investor_graph(state["df"]),
+                                       sketches=get_sketches(state["df"]) if APPROX else None)
+
+    def overall_filtered():
+        analysis.load_overall_analysis(state["city"], cube=get_cube(state["df"]),
+                                       graph=get_investor_graph(state["df"]),
+                                       sketches=get_sketches(state["df"]) if APPROX else None)
+
+    def startup():
+        df, index = state["df"], get_startup_index(state["df"])
+        name = df["Startup"].value_counts().index[0]
+        startup_view.load_startup_details(df, index.names[index.code(name)], index=index)
+
+    def investor():
+        df, index = state["df"], get_investor_index(state["df"])
+        investor_view.load_investor_details(df, index.names[int(np.argmax(np.diff(index.bounds)))],
+                                            index=index, graph=get_investor_graph(df))
+
+    return [("read_csv", read_csv), ("parse", parse), ("load", load),
+            ("load_snapshot", load_snapshot), ("filter", filter_), ("overall", overall),
+            ("overall_warm", overall), ("overall_filtered", overall_filtered),
+            ("startup", startup), ("investor", investor)]
+
+
+def reset_caches(snapshot_dir):
+    """Drop every in-process cache and the snapshot so the next pass starts cold."""
+    import aggregates, charts
+    aggregates.clear_cache()
+    charts.clear_cache()
+    streamlit.cache_data.clear()
+    streamlit.cache_resource.clear()
+    shutil.rmtree(snapshot_dir, ignore_errors=True)   # partitions and deltas are directories
+
+
+# Memory
+def _rss_mb():
+    """Resident set size now; where /proc is missing, the process's peak so far."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # bytes on macOS, KiB elsewhere
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _arrow_mb():
+    return pa.total_allocated_bytes() / 2**20
+
+
+@contextlib.contextmanager
+def growth(read, interval=0.002):
+    """Peak of ``read()`` (MB) over the block minus its value at the start, in ``out["mb"]``.
+
+    Sampled from a thread every ``interval`` seconds, and once more at the end.
+    """
+    start, out, done = read(), {"mb": 0.0}, threading.Event()
+
+    def sample():
+        peak = start
+        while not done.wait(interval):
+            peak = max(peak, read())
+        out["mb"] = max(peak, read()) - start
+
+    t = threading.Thread(target=sample, daemon=True)
+    t.start()
+    try:
+        yield out
+    finally:
+        done.set()
+        t.join()
+
+
+@contextlib.contextmanager
+def heap_peak():
+    """Peak Python heap plus peak Arrow growth over the block, in ``out["mb"]``.
+
+    tracemalloc sees only Python allocations; pandas strings and the snapshot
+    live in Arrow buffers, counted by Arrow's default pool.
+    """
+    out = {"mb": 0.0}
+    tracemalloc.start()
+    try:
+        with growth(_arrow_mb) as arrow:
+            yield out
+    finally:
+        out["mb"] = tracemalloc.get_traced_memory()[1] / 2**20 + arrow["mb"]
+        tracemalloc.stop()
+
+
+def measure(fn, traced=False):
+    import charts
+    charts.reset_timings()
+    with (heap_peak() if traced else growth(_rss_mb)) as mem:
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except _Stop:
+            pass
+        wall = time.perf_counter() - t0
+    if traced:
+        return {"peak_mb": round(mem["mb"], 1)}
+    return {"wall_s": round(wall, 3), "rss_mb": round(mem["mb"], 1),
+            "figures": _figures()[0], "cached": _figures()[1]}
+
+
+def run(scales=SCALES, compact_schema=False, out_dir=BENCH_DIR):
+    """One row per (scale, stage).
+
+    Each scale runs twice from cold caches: once timed, with the peak RSS
+    growth sampled alongside, and once under tracemalloc, with Arrow's pool
+    sampled, for the peak heap, Python plus Arrow (tracing slows the code
+    down several times).
+    """
+    rows = []
+    with headless():
+        for scale in scales:
+            path = synthetic(scale, out_dir=out_dir)
+            snapshot_dir = os.path.join(out_dir, f"snapshot-x{scale}")
+            timed = []
+            reset_caches(snapshot_dir)
+            for name, fn in stages(path, snapshot_dir, compact_schema):
+                timed.append({"scale": scale, "stage": name, **measure(fn)})
+                print(f"x{scale:<5} {name:<17} {timed[-1]['wall_s']:>8.3f}s "
+                      f"{timed[-1]['rss_mb']:>7.1f} MB rss {timed[-1]['figures']:>3} figures", flush=True)
+            reset_caches(snapshot_dir)
+            for row, (name, fn) in zip(timed, stages(path, snapshot_dir, compact_schema)):
+                rows.append({**row, **measure(fn, traced=True)})
+    return pd.DataFrame(rows)
+
+
+# Cold start
+def import_report(stages=IMPORT_STAGES, top=8):
+    """``-X importtime`` of a fresh interpreter importing each stage's modules in turn.
+
+    One row per stage total plus its ``top`` heaviest root packages (cumulative
+    times include what those packages import themselves, so they overlap).
+    """
+    code = ["import sys"]
+    for stage, modules in stages:
+        code += [f"print('#stage {stage}', file=sys.stderr, flush=True)",
+                 *[f"import {m}" for m in modules]]
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "\n".join(code)],
+                         capture_output=True, text=True, check=True).stderr
+    rows, stage = [], None
+    for line in out.splitlines():
+        if line.startswith("#stage "):
+            stage = line[len("#stage "):]
+        elif stage and line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                rows.append({"stage": stage, "module": name.strip(),
+                             "level": (len(name) - len(name.lstrip()) - 1) // 2,
+                             "ms": int(cumulative) / 1000})
+    imports = pd.DataFrame(rows, columns=["stage", "module", "level", "ms"])
+    report = []
+    for stage, _ in stages:
+        mine = imports[imports["stage"] == stage]
+        report.append({"stage": stage, "module": "(total)",
+                       "ms": mine.loc[mine["level"] == 0, "ms"].sum()})
+        roots = (mine[~mine["module"].str.contains(".", regex=False)]
+                 .sort_values("ms", ascending=False).drop_duplicates("module").head(top))
+        report += [{"stage": stage, "module": m, "ms": ms} for m, ms in zip(roots["module"], roots["ms"])]
+    return pd.DataFrame(report).round({"ms": 1})
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Rows of ``results`` slower or bigger than ``baseline`` beyond the tolerance.
+
+    Measures the baseline lacks (an older file) are skipped.
+    """
+    base = pd.DataFrame(baseline)
+    merged = results.merge(base, on=["scale","stage"], suffixes=("","_base"))
+    bad = np.zeros(len(merged), dtype=bool)
+    cols = [c for c in NOISE if c in base]
+    for col in cols:
+        grew = merged[col] - merged[f"{col}_base"]
+        bad |= (grew > NOISE[col]) & (merged[col] > merged[f"{col}_base"] * (1 + tolerance))
+    return merged.loc[bad, ["scale","stage"] + [c + s for c in cols for s in ("", "_base")]]
+
+
+def unmatched(results, baseline):
+    """(scale, stage) pairs of ``results`` the baseline has no row for."""
+    have = {(r["scale"], r["stage"]) for r in baseline}
+    return [(s, n) for s, n in zip(results["scale"], results["stage"]) if (s, n) not in have]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard headless on synthetic data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES,
+                        help="dataset sizes as multiples of StartUp.csv")
+    parser.add_argument("--compact", action="store_true", help="use the compact schema")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to check against")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--out-dir", default=BENCH_DIR, help="synthetic data and snapshots")
+    parser.add_argument("--imports", action="store_true",
+                        help="only report cold-start import times per page")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        print(import_report().to_string(index=False))
+        return
+
+    results = run(args.scales, args.compact, args.out_dir)
+    print("\n" + results.to_string(index=False))
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results.to_dict("records"), f, indent=1)
+        print(f"baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args.tolerance)
+        missing = unmatched(results, baseline)
+        if missing:
+            print(f"\nWARNING: {args.baseline} has no row for " +
+                  ", ".join(f"x{s} {n}" for s, n in missing) + "; those stages were not checked",
+                  file=sys.stderr)
+        if len(regressed):
+            print("\nREGRESSED beyond baseline:\n" + regressed.to_string(index=False))
+            raise SystemExit(1)
+        print("\nno regressions against baseline")
+    else:
+        print(f"\nWARNING: no baseline at {args.baseline}; nothing was checked "
+              "(--save-baseline to create one)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+import contextlib
+import functools
+import hashlib
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import streamlit as st
+
+import perf
+from data_loader import fmt
+
+# Shared chart rendering. Views describe a chart as (kind, aggregate, figsize,
+# style options); render() draws it on a standalone Figure that never enters
+# pyplot's global registry, so nothing leaks between reruns, and caches the
+# encoded image under a digest of the aggregate and style. Unchanged charts
+# are served from the cache instead of being re-plotted.
+#
+# With the "vega" backend the same chart definitions are sent to the browser as
+# Vega-Lite specs (see vega.py) and drawn there; matplotlib is then never
+# imported. It is imported on first use, so the choice also shortens start-up.
+
+# Style constants
+PRIMARY   = "#6C63FF"
+SECONDARY = "#FF6584"
+ACCENT    = "#43C6AC"
+BG        = "#F8F9FB"
+COLORS    = [PRIMARY, SECONDARY, ACCENT, "#F7B731", "#20BF6B", "#EB3B5A",
+             "#2D98DA", "#FD9644", "#A55EEA", "#26de81"]
+
+IMAGE_FORMAT = os.environ.get("DASH_CHART_FORMAT", "png")   # png | svg
+DPI          = 200
+MAX_WIDTH_PX = 1400   # st.image re-encodes anything wider than 1460px on every call
+MAX_CHARTS   = 256
+BACKEND      = os.environ.get("DASH_CHART_BACKEND", "matplotlib")   # matplotlib | vega
+# Render charts in a process pool of this size (0: in the script thread).
+# Pages then place each chart's slot in order and fill the slots in flush().
+# The pool is started by the warm-up (start_pool()), never inside a page run;
+# until it is up, or if it breaks, charts are drawn in the script thread.
+RENDER_PROCESSES = int(os.environ.get("DASH_RENDER_PROCESSES", "0"))
+
+Chart = namedtuple("Chart", "kind data figsize opts")
+
+_cache = OrderedDict()
+_lock  = threading.Lock()
+_local = threading.local()
+_pool  = None
+
+
+def chart(kind, data, figsize=(6,4), **opts):
+    return Chart(kind, data, tuple(figsize), opts)
+
+
+# Drawers: one per chart kind, each drawing ``data`` onto ``ax``
+def _bar(fig, ax, s, colors=None, alpha=None, label_size=None, label_pad=1.01):
+    bars = ax.bar([str(i) for i in s.index], s.values, color=colors, alpha=alpha, edgecolor="white")
+    if label_size:
+        for bar in bars:
+            ax.text(bar.get_x()+bar.get_width()/2, bar.get_height()*label_pad,
+                    fmt(bar.get_height()), ha="center", va="bottom",
+                    fontsize=label_size, fontweight="bold")
+
+
+def _barh(fig, ax, s, color=None, alpha=None, height=0.5, value_fmt=None, invert=False):
+    bars = ax.barh([str(i) for i in s.index], s.values, height=height, color=color, alpha=alpha)
+    if value_fmt:
+        for bar in bars:
+            ax.text(bar.get_width()+0.005, bar.get_y()+bar.get_height()/2,
+                    value_fmt.format(bar.get_width()), va="center", fontsize=8, fontweight="bold")
+    if invert:
+        ax.invert_yaxis()
+
+
+def _pie(fig, ax, s, colors=None, pct_size=None):
+    _, _, autotexts = ax.pie(s.values, labels=[str(i) for i in s.index],
+                             autopct="%1.1f%%", startangle=140,
+                             colors=colors, pctdistance=0.8)
+    if pct_size:
+        for t in autotexts: t.set_fontsize(pct_size)
+
+
+def _hist(fig, ax, d, color=PRIMARY):
+    # Pre-binned: one row per bin with lo/hi edges and a count.
+    if len(d):
+        ax.hist(d["lo"], bins=[*d["lo"], *d["hi"].iloc[-1:]], weights=d["count"],
+                color=color, alpha=0.8, edgecolor="white")
+
+
+def _dual(fig, ax, d, x, left, right, left_kind="area", right_kind="bar",
+          left_color=PRIMARY, right_color=SECONDARY, left_label=None, right_label=None,
+          right_ylabel=None, annotate=False, legend=False):
+    X = d[x]
+    if left_kind == "area":
+        ax.fill_between(X, d[left], alpha=0.18, color=left_color)
+        ax.plot(X, d[left], marker="o", color=left_color,
+                linewidth=2.5, markersize=8, label=left_label)
+    else:
+        ax.bar(X, d[left], color=left_color, alpha=0.8, width=0.4, label=left_label)
+    if annotate:
+        for xv, yv in zip(X, d[left]):
+            ax.annotate(fmt(yv), (xv, yv), textcoords="offset points", xytext=(0,8),
+                        ha="center", fontsize=9, fontweight="bold", color=left_color)
+    twin = ax.twinx()
+    if right_kind == "bar":
+        twin.bar(X, d[right], alpha=0.2, color=right_color, width=0.4, label=right_label)
+    else:
+        twin.plot(X, d[right], marker="o", color=right_color, linewidth=2, label=right_label)
+    twin.set_ylabel(right_ylabel, color=right_color)
+    ax.set_xticks(X)
+    if legend:
+        lines1, labels1 = ax.get_legend_handles_labels()
+        lines2, labels2 = twin.get_legend_handles_labels()
+        ax.legend(lines1+lines2, labels1+labels2, loc="upper left")
+
+
+def _grouped_bar(fig, ax, d, x, series, width=0.35):
+    # series: [(column, label, color), ...] drawn side by side per x value
+    pos = range(len(d))
+    offset = -width * (len(series) - 1) / 2
+    for i, (col, label, color) in enumerate(series):
+        ax.bar([p + offset + i*width for p in pos], d[col], width=width,
+               label=label, color=color, alpha=0.85)
+    ax.set_xticks(list(pos)); ax.set_xticklabels(d[x])
+    ax.legend()
+
+
+def _stacked_bar(fig, ax, d, legend_title=None):
+    d.plot(kind="bar", stacked=True, ax=ax,
+           color=COLORS[:len(d.columns)], edgecolor="white", alpha=0.9)
+    ax.legend(title=legend_title, bbox_to_anchor=(1.01,1), loc="upper left")
+
+
+def _area(fig, ax, s, color=PRIMARY, marker=None, categorical=False):
+    x = range(len(s)) if categorical else s.index
+    ax.fill_between(x, s.values, alpha=0.2, color=color)
+    ax.plot(x, s.values, marker=marker, color=color, linewidth=2)
+    if categorical:
+        ax.set_xticks(list(x)); ax.set_xticklabels([str(i) for i in s.index])
+
+
+def _bubble(fig, ax, d, x, y, size, label, size_scale=1e-4):
+    ax.scatter(d[x], d[y], s=d[size]*size_scale, c=range(len(d)),
+               cmap="viridis", alpha=0.75, edgecolors="white", linewidths=1)
+    for xv, yv, name in zip(d[x], d[y], d[label]):
+        ax.annotate(name, (xv, yv), fontsize=7.5, ha="center", va="bottom",
+                    xytext=(0,6), textcoords="offset points")
+
+
+def _heatmap(fig, ax, d, scale=1, cbar_label=None):
+    import seaborn as sns
+    sns.heatmap(d/scale, cmap="YlOrRd", ax=ax, fmt=".0f", linewidths=0.5, annot=True,
+                cbar_kws={"label": cbar_label})
+
+
+DRAWERS = {
+    "bar": _bar, "barh": _barh, "pie": _pie, "hist": _hist, "dual": _dual,
+    "grouped_bar": _grouped_bar, "stacked_bar": _stacked_bar, "area": _area,
+    "bubble": _bubble, "heatmap": _heatmap,
+}
+DECORATIONS = {"title", "title_style", "xlabel", "ylabel", "money", "xrot", "xha", "xsize"}
+
+
+def _decorate(ax, title=None, title_style=None, xlabel=None, ylabel=None,
+              money=None, xrot=None, xha=None, xsize=None, despine=True):
+    if money:
+        import matplotlib.ticker as mticker
+        axis = ax.xaxis if money == "x" else ax.yaxis
+        axis.set_major_formatter(mticker.FuncFormatter(lambda v,_: fmt(v)))
+    if title is not None:
+        ax.set_title(title, **(title_style or {"fontweight": "bold"}))
+    if xlabel is not None: ax.set_xlabel(xlabel)
+    if ylabel is not None: ax.set_ylabel(ylabel)
+    if xrot is not None or xsize is not None:
+        for t in ax.get_xticklabels():
+            if xrot is not None: t.set_rotation(xrot)
+            if xha is not None:  t.set_ha(xha)
+            if xsize is not None: t.set_fontsize(xsize)
+    if despine:
+        for spine in ["top","right"]:
+            ax.spines[spine].set_visible(False)
+
+
+def _digest(c, image_format):
+    h = hashlib.blake2b(digest_size=16)
+    data = c.data
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        labels = list(data.columns) if isinstance(data, pd.DataFrame) else data.name
+        h.update(repr((labels, list(data.index.names))).encode())
+    else:
+        h.update(repr(data).encode())
+    h.update(repr((c.kind, c.figsize, sorted(c.opts.items()), image_format, DPI)).encode())
+    return h.hexdigest()
+
+
+def draw(c, image_format=IMAGE_FORMAT):
+    """Encoded image of chart ``c`` (uncached)."""
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=c.figsize)
+    ax = fig.add_subplot()
+    deco = {k: v for k, v in c.opts.items() if k in DECORATIONS}
+    DRAWERS[c.kind](fig, ax, c.data, **{k: v for k, v in c.opts.items() if k not in DECORATIONS})
+    _decorate(ax, despine=c.kind not in ("pie", "heatmap"), **deco)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    dpi = min(DPI, MAX_WIDTH_PX / c.figsize[0])
+    fig.savefig(buf, format=image_format, dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def render(c, image_format=IMAGE_FORMAT):
+    """(image bytes, served_from_cache) for chart ``c``."""
+    key = _digest(c, image_format)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key], True
+    image = draw(c, image_format)
+    with _lock:
+        _cache[key] = image
+        while len(_cache) > MAX_CHARTS:
+            _cache.popitem(last=False)
+    return image, False
+
+
+def start_pool():
+    """Start the render pool once per process; called from the warm-up thread."""
+    global _pool
+    with _lock:
+        if _pool is None and RENDER_PROCESSES:
+            # matplotlib is not thread-safe and forking a threaded server is
+            # unsafe, so workers are fresh processes. They are all started
+            # here, with a plain __main__: a worker would otherwise re-run the
+            # Streamlit script, which is __main__ while the page runs. The swap
+            # is process-wide, so it happens once, at warm-up, and a broken
+            # pool is not restarted mid-traffic.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            ctx = multiprocessing.get_context(method)
+            if method == "forkserver":
+                ctx.set_forkserver_preload(["charts", "matplotlib.figure"])
+            main, sys.modules["__main__"] = sys.modules["__main__"], types.ModuleType("__main__")
+            try:
+                _pool = ProcessPoolExecutor(RENDER_PROCESSES, mp_context=ctx)
+                for _ in range(RENDER_PROCESSES):
+                    _pool.submit(int)
+            finally:
+                sys.modules["__main__"] = main
+        return _pool
+
+
+def _discard_pool():
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def pooled():
+    """Whether charts are currently drawn in the render pool."""
+    return _pool is not None
+
+
+def submit(c, image_format=IMAGE_FORMAT):
+    """Future of (image bytes, served_from_cache) for chart ``c``; misses are drawn in the pool.
+
+    If the pool breaks (a worker died), it is dropped and the future fails with
+    BrokenProcessPool; flush() then draws the chart in the script thread.
+    """
+    key = _digest(c, image_format)
+    out = Future()
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            out.set_result((_cache[key], True))
+            return out
+
+    def store(image):
+        with _lock:
+            _cache[key] = image
+            while len(_cache) > MAX_CHARTS:
+                _cache.popitem(last=False)
+        out.set_result((image, False))
+
+    def done(f):
+        # Runs on the executor's thread: never draw here, matplotlib is not thread-safe.
+        try:
+            image = f.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _discard_pool()
+            out.set_exception(e)
+            return
+        store(image)
+
+    try:
+        pool = _pool
+        if pool is None:
+            raise BrokenProcessPool("render pool is not running")
+        pool.submit(draw, c, image_format).add_done_callback(done)
+    except BrokenProcessPool as e:
+        _discard_pool()
+        out.set_exception(e)
+    return out
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def _image(target, image):
+    if IMAGE_FORMAT == "svg":
+        target.image(image.decode(), use_container_width=True)
+    else:
+        target.image(image, use_container_width=True)
+
+
+def backend():
+    """Chart backend of the current script run (see using())."""
+    return getattr(_local, "backend", BACKEND)
+
+
+@contextlib.contextmanager
+def using(name):
+    """Render with backend ``name`` inside the block (e.g. images for a static export)."""
+    saved, _local.backend = backend(), name
+    try:
+        yield
+    finally:
+        _local.backend = saved
+
+
+def show(c, name):
+    """Render chart ``c`` into the current Streamlit container, timing it under ``name``.
+
+    With a render pool the chart only gets its slot here; flush() fills it.
+    """
+    t0 = time.perf_counter()
+    if backend() == "vega":
+        import vega
+        data, spec = vega.spec(c)
+        st.vega_lite_chart(data, spec, use_container_width=True)
+        _timed(name, (time.perf_counter() - t0) * 1000, False)
+        return
+    if pooled():
+        future = submit(c)
+        future.add_done_callback(lambda f: setattr(f, "finished", time.perf_counter()))
+        _pending().append((name, t0, st.empty(), c, future))
+        return
+    image, cached = render(c)
+    _timed(name, (time.perf_counter() - t0) * 1000, cached)
+    _image(st, image)
+
+
+def flush():
+    """Wait for the charts shown since the last flush and place them in their slots."""
+    pending, _local.pending = _pending(), []
+    for name, t0, slot, c, future in pending:
+        try:
+            image, cached = future.result()
+            finished = getattr(future, "finished", time.perf_counter())
+        except BrokenProcessPool:
+            image, cached = render(c)
+            finished = time.perf_counter()
+        _timed(name, (finished - t0) * 1000, cached)
+        _image(slot, image)
+
+
+# Per-run render timings and pending charts (scripts run one per thread)
+def _timings():
+    if not hasattr(_local, "timings"):
+        _local.timings = []
+    return _local.timings
+
+
+def _timed(name, ms, cached):
+    _timings().append((name, ms, cached))
+    if perf.active():
+        perf.record(f"chart {name}", ms, cached=cached)
+
+
+def _pending():
+    if not hasattr(_local, "pending"):
+        _local.pending = []
+    return _local.pending
+
+
+def reset_timings():
+    _local.timings = []
+    _local.pending = []
+
+
+def page(fn):
+    """Decorator for a page function: fresh timings, and its pooled charts placed however it returns."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        reset_timings()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            flush()
+    return wrapper
+
+
+def render_timings():
+    """Render time per chart shown since the last reset_timings()."""
+    t = pd.DataFrame(_timings(), columns=["chart", "ms", "cached"])
+    t["ms"] = t["ms"].round(1)
+    return t
+
+
+def show_timings():
+    flush()
+    t = render_timings()
+    with st.expander(f"Chart render times ({t['ms'].sum():.0f} ms, "
+                     f"{int(t['cached'].sum())}/{len(t)} cached)"):
+        st.dataframe(t, use_container_width=True, hide_index=True)
@@ -0,0 +1,263 @@
+import argparse
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import aggregates as agg
+from aggregates import memoized, ranked, CATEGORY_ORDER
+from data_loader import MONTHS
+
+# Pre-aggregated cube behind the Overall Analysis page. ``cells`` holds one row
+# per distinct (Year, Month, Industry, City, Funding_Round, Funding_Category)
+# with sum/count/first/last of the deals in it; ``startups`` holds per-startup
+# totals at the filter grain so distinct counts and top startups roll up too.
+# Distinct counts do not add up across cells, so they need the startup at the
+# filter grain; on StartUp.csv that is about half as many rows as deals (most
+# startups raise once per year), but five narrow columns instead of the frame's
+# thirty, and it is what keeps "Unique Startups" and "Top Startups" exact.
+# Sidebar filters slice both tables, so the page scales with the number of
+# distinct combinations rather than with the number of deals.
+CUBE_DIMS    = ["Year", "Month", "Industry", "City", "Funding_Round", "Funding_Category"]
+STARTUP_DIMS = ["Year", "Industry", "City", "Funding_Round", "Startup"]
+VERIFY       = os.environ.get("DASH_VERIFY_CUBE", "") == "1"
+
+Cube = namedtuple("Cube", "cells startups")
+
+
+def build_cube(df):
+    cells = df.groupby(CUBE_DIMS, observed=True).agg(
+        Amount=("Amount","sum"),
+        Deals=("Amount","count"),
+        First=("Date","min"),
+        Last=("Date","max"),
+    ).reset_index()
+    startups = (df.groupby(STARTUP_DIMS, observed=True)["Amount"].sum()
+                  .reset_index())
+    return Cube(cells, startups)
+
+
+def merge_cube(a, b):
+    """Cube of the deals behind both ``a`` and ``b`` (disjoint sets of deals)."""
+    cells = pd.concat([a.cells, b.cells], ignore_index=True).groupby(CUBE_DIMS, observed=True).agg(
+        Amount=("Amount","sum"),
+        Deals=("Deals","sum"),
+        First=("First","min"),
+        Last=("Last","max"),
+    ).reset_index()
+    startups = (pd.concat([a.startups, b.startups], ignore_index=True)
+                  .groupby(STARTUP_DIMS, observed=True)["Amount"].sum().reset_index())
+    return Cube(cells, startups)
+
+
+# Recent cubes by version, so a frame with appended rows (see
+# data_loader.apply_deltas) extends its parent's cube instead of rebuilding.
+_recent = OrderedDict()
+_lock   = threading.Lock()
+
+
+@st.cache_resource(max_entries=2)
+def load_cube(_df, version):
+    with _lock:
+        parent = _recent.get(_df.attrs.get("parent"))
+    if parent is None:
+        cube = build_cube(_df)
+    else:
+        cube = merge_cube(parent, build_cube(_df.iloc[len(_df) - _df.attrs["appended"]:]))
+    with _lock:
+        _recent[version] = cube
+        while len(_recent) > 4:
+            _recent.popitem(last=False)
+    return cube
+
+
+def get_cube(df):
+    """Cube for the full loaded frame, cached by its data version."""
+    version = df.attrs.get("version")
+    return build_cube(df) if version is None else load_cube(df, version)
+
+
+def slice_cube(cube, year="All", industry="All", city="All", rounds=None):
+    """The part of the cube matching a sidebar selection."""
+    def mask(t):
+        m = np.ones(len(t), dtype=bool)
+        if year != "All":     m &= (t["Year"] == year).to_numpy()
+        if industry != "All": m &= (t["Industry"] == industry).to_numpy()
+        if city != "All":     m &= (t["City"] == city).to_numpy()
+        if rounds is not None: m &= t["Funding_Round"].isin(rounds).to_numpy()
+        return m
+    return Cube(cube.cells[mask(cube.cells)], cube.startups[mask(cube.startups)])
+
+
+def _sum_by(c, by, col="Amount"):
+    return c.cells.groupby(by, observed=True)[col].sum()
+
+
+# Roll-ups: same names and result shapes as their aggregates.* counterparts.
+@memoized
+def kpis(c):
+    return {
+        "period_start":  c.cells["First"].min().strftime("%b %Y"),
+        "period_end":    c.cells["Last"].max().strftime("%b %Y"),
+        "records":       int(c.cells["Deals"].sum()),
+        "total_funding": float(c.cells["Amount"].sum()),
+        "startups":      int(c.startups["Startup"].nunique()),
+        "industries":    int(c.cells["Industry"].nunique()),
+        "cities":        int(c.cells["City"].nunique()),
+    }
+
+
+@memoized
+def industry_funding(c):
+    return ranked(_sum_by(c, "Industry"), 12)
+
+
+@memoized
+def city_funding(c):
+    return ranked(_sum_by(c, "City"), 10)
+
+
+@memoized
+def city_deals(c):
+    return ranked(_sum_by(c, "City", "Deals").rename("count"), 10)
+
+
+@memoized
+def category_counts(c):
+    return ranked(_sum_by(c, "Funding_Category", "Deals").rename("count"))
+
+
+@memoized
+def round_counts(c):
+    return ranked(_sum_by(c, "Funding_Round", "Deals").rename("count"))
+
+
+@memoized
+def top_startups(c):
+    return ranked(c.startups.groupby("Startup", observed=True)["Amount"].sum(), 15)
+
+
+@memoized
+def category_funding(c):
+    cat_amt = _sum_by(c, "Funding_Category")
+    return cat_amt.reindex([x for x in CATEGORY_ORDER if x in cat_amt.index])
+
+
+@memoized
+def yoy(c):
+    out = c.cells.groupby("Year").agg(Total=("Amount","sum"), Deals=("Deals","sum"))
+    out["AvgDeal"]  = out["Total"] / out["Deals"]
+    out["Startups"] = c.startups.groupby("Year")["Startup"].nunique()
+    return out.reset_index()
+
+
+@memoized
+def stage_by_year(c):
+    return _sum_by(c, ["Year","Funding_Round"]).unstack(fill_value=0)
+
+
+@memoized
+def cumulative_funding(c):
+    monthly = _sum_by(c, ["Year","Month"]).reset_index()
+    monthly.insert(0, "YearMonth", pd.to_datetime(
+        pd.DataFrame({"year": monthly["Year"], "month": monthly["Month"], "day": 1})))
+    monthly = monthly.drop(columns=["Year","Month"]).sort_values("YearMonth")
+    monthly["Cumulative"] = monthly["Amount"].cumsum()
+    return monthly
+
+
+@memoized
+def monthly_pattern(c):
+    by_month = _sum_by(c, "Month")
+    by_month.index = pd.Index([MONTHS[m - 1] for m in by_month.index], name="Month_Name")
+    return by_month.reindex([m for m in MONTHS if m in by_month.index])
+
+
+@memoized
+def industry_bubble(c):
+    out = c.cells.groupby("Industry", observed=True).agg(
+        TotalFunding=("Amount","sum"),
+        DealCount=("Deals","sum"),
+    )
+    out["AvgDeal"] = out["TotalFunding"] / out["DealCount"]
+    return out.reset_index().sort_values("TotalFunding", ascending=False).head(20)
+
+
+@memoized
+def month_year_heatmap(c):
+    heatmap_data = _sum_by(c, ["Month","Year"]).unstack(fill_value=0).astype(float)
+    heatmap_data.index = pd.Index([MONTHS[m - 1] for m in heatmap_data.index], name="Month_Name")
+    return heatmap_data
+
+
+ROLLUPS = ["kpis", "industry_funding", "city_funding", "city_deals", "category_counts",
+           "round_counts", "top_startups", "category_funding", "yoy", "stage_by_year",
+           "cumulative_funding", "monthly_pattern", "industry_bubble", "month_year_heatmap"]
+
+
+# Verification: cube roll-ups vs. the raw-frame aggregates
+def _same(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(
+            np.isclose(a[k], b[k]) if isinstance(a[k], float) else a[k] == b[k] for k in a)
+    if isinstance(a, pd.Series):
+        a, b = a.to_frame("value"), b.to_frame("value")
+    try:
+        pd.testing.assert_frame_equal(_rows(a), _rows(b), check_exact=False,
+                                      check_dtype=False, check_categorical=False)
+    except AssertionError:
+        return False
+    return True
+
+
+def _rows(x):
+    """``x`` as plain rows sorted by their keys (index and non-float columns).
+
+    Row order may differ on ties, so both sides are sorted the same way and
+    then compared row by row: a total attributed to the wrong key fails.
+    """
+    x = x.rename(columns=str)
+    if not isinstance(x.index, pd.RangeIndex):
+        x = x.rename_axis([f"key{i}" for i in range(x.index.nlevels)]).reset_index()
+    x = x.astype({c: str for c in x.columns if isinstance(x[c].dtype, pd.CategoricalDtype)})
+    keys = [c for c in x.columns if not pd.api.types.is_float_dtype(x[c])]
+    return (x.sort_values(keys, kind="stable") if keys else x).reset_index(drop=True)
+
+
+def verify(c, df):
+    """Compare every roll-up of cube slice ``c`` with the raw aggregate of ``df``."""
+    rows = []
+    for name in ROLLUPS:
+        rows.append({"aggregate": name,
+                     "match": _same(globals()[name](c), getattr(agg, name)(df))})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    import data_loader
+    import filters
+
+    parser = argparse.ArgumentParser(description="Check cube roll-ups against raw aggregates.")
+    parser.add_argument("--compact", action="store_true", help="use the compact schema")
+    args = parser.parse_args(argv)
+
+    df = data_loader.read_dataset(compact_schema=args.compact)
+    index, cube = filters.FilterIndex(df), build_cube(df)
+    selections = [{}] + [{"year": y} for y in index.options["Year"]] \
+                      + [{"city": c} for c in index.options["City"][:10]] \
+                      + [{"rounds": [r]} for r in index.options["Funding_Round"]]
+    failed = 0
+    for sel in selections:
+        rep = verify(slice_cube(cube, **sel), filters.filter_frame(df, index=index, **sel))
+        bad = rep.loc[~rep["match"], "aggregate"].tolist()
+        failed += bool(bad)
+        print(f"{sel or 'all'}: {'ok' if not bad else 'MISMATCH ' + ', '.join(bad)}")
+    print(f"cube: {len(cube.cells):,} cells, {len(cube.startups):,} startup rows for {len(df):,} deals")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,119 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
 import streamlit as st
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv("StartUp.csv")
+import perf
+
+try:
+    import fcntl
+except ImportError:   # Windows: concurrent publishers of the shared dataset just repeat the work
+    fcntl = None
+
+DATA_PATH    = "StartUp.csv"
+SNAPSHOT_DIR = ".snapshot"
+
+# Compact schema (opt-in): DASH_COMPACT=1
+COMPACT          = os.environ.get("DASH_COMPACT", "") == "1"
+ALIASES          = {"Industry Vertical": "Industry", "Startup Name": "Startup",
+                    "Investment Type": "InvestmentType"}
+UNUSED_COLUMNS   = ["Unnamed: 0", "Amount in USD", "Amount in Rs(Cr)",
+                    "Investor_Rank_y", "Power_Score_y"]
+SCORE_COLUMNS    = ["Power_Score_x", "Influence_Index"]
+MONTHS           = ["Jan","Feb","Mar","Apr","May","Jun",
+                    "Jul","Aug","Sep","Oct","Nov","Dec"]
+MAX_CATEGORY_RATIO = 0.5   # distinct/rows below which a string column becomes categorical
+
+# Date formats tried in order; the feed is day-first.
+DATE_FORMATS = ["%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d", "%d-%m-%y", "%d/%m/%y"]
+
+# Year-partitioned store (opt-in): DASH_PARTITIONED=1
+PARTITIONED = os.environ.get("DASH_PARTITIONED", "") == "1"
+CHUNK_ROWS  = 100_000
+
+# Append mode: delta CSVs of new rounds, applied in file-name order. Rows are
+# one per (deal, investor) and Sr No is shared by a deal's rows, so new rows
+# are de-duplicated on the deal plus its investor.
+DELTA_DIR = "deltas"
+DEDUP_KEY = ["Date", "Startup", "Amount", "Investors"]
+
+# Shared dataset (opt-in): DASH_SHARED=1
+SHARED = os.environ.get("DASH_SHARED", "") == "1"
+
+
+def parse_dates(s, formats=DATE_FORMATS):
+    """Dates parsed by trying each format, in one vectorized pass, on the values still unparsed.
+
+    Returns (dates, counts) with the rows matched per format, "missing" and
+    "rejected". Values with stray whitespace are stripped and retried.
+    """
+    dates  = np.full(len(s), np.datetime64("NaT"), dtype="datetime64[us]")
+    todo   = s.notna().to_numpy().copy()
+    counts = dict.fromkeys(formats, 0)
+    counts["missing"] = int((~todo).sum())
+    text = s
+    for attempt in range(2):
+        for f in formats:
+            if not todo.any():
+                break
+            parsed = pd.to_datetime(text[todo], format=f, errors="coerce")
+            hit = parsed.notna().to_numpy()
+            pos = np.flatnonzero(todo)[hit]
+            dates[pos] = parsed[hit].to_numpy().astype("datetime64[us]")
+            todo[pos]  = False
+            counts[f] += len(pos)
+        text = s.astype("str").str.strip()
+    counts["rejected"] = int(todo.sum())
+    return pd.Series(dates, index=s.index, name=s.name), counts
+
+
+def parse_amounts(s):
+    """Amounts as float (commas, spaces and "$" allowed in text); unparseable -> 0.
+
+    Returns (amounts, counts) with "parsed", "missing" and "rejected" rows.
+    """
+    if pd.api.types.is_numeric_dtype(s):
+        values = s.astype("float64")
+    else:
+        values = pd.to_numeric(s.astype("str").str.replace(r"[,$\s]", "", regex=True), errors="coerce")
+    counts = {"parsed":   int(values.notna().sum()),
+              "missing":  int(s.isna().sum()),
+              "rejected": int((values.isna() & s.notna()).sum())}
+    return values.fillna(0), counts
 
+
+def clean(df):
+    """Cleaning & feature engineering applied to the raw CSV frame.
+
+    Row counts per date format / rejected are kept in ``df.attrs["parse_report"]``.
+    """
     # Date
-    df["Date"] = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce")
-    df = df.dropna(subset=["Date"])
-    df["Year"]       = df["Date"].dt.year.astype(int)
-    df["Month"]      = df["Date"].dt.month.astype(int)
-    df["Month_Name"] = df["Date"].dt.strftime("%b")
-    df["YearMonth"]  = df["Date"].dt.to_period("M").dt.to_timestamp()
+    dates, date_counts = parse_dates(df["Date"])
+    df = df[dates.notna().to_numpy()].copy()
+    df["Date"] = dates[dates.notna()]
+    months = df["Date"].to_numpy().astype("datetime64[M]").astype(np.int64)   # months since 1970-01
+    df["Year"]       = months // 12 + 1970
+    df["Month"]      = months % 12 + 1
+    df["Month_Name"] = pd.Series(np.array(MONTHS, dtype=object)[months % 12], index=df.index, dtype="str")
+    df["YearMonth"]  = months.astype("datetime64[M]").astype("datetime64[us]")
 
     # Amount
-    df["Amount"] = pd.to_numeric(df["Amount in USD"], errors="coerce").fillna(0)
+    df["Amount"], amount_counts = parse_amounts(df["Amount in USD"])
 
     # Clean strings
     df["Investors"]         = df["Investors"].fillna("Undisclosed").str.strip().str.strip('"')
@@ -31,12 +130,579 @@ def load_data():
     df["Startup"]        = df["Startup Name"]
     df["InvestmentType"] = df["Investment Type"]
 
+    df.attrs["parse_report"] = {"dates": date_counts, "amounts": amount_counts}
+    return df
+
+
+def compact(df):
+    """Memory-lean copy of a cleaned frame: categoricals, downcast numerics, no duplicate columns."""
+    # Aliases become the only copy of their column; nothing reads the long names.
+    out = df.drop(columns=[c for c in [*UNUSED_COLUMNS, *ALIASES] if c in df.columns])
+
+    for col in out.columns:
+        s = out[col]
+        if col == "Month_Name":
+            out[col] = pd.Categorical(s, categories=MONTHS, ordered=True)
+        elif pd.api.types.is_string_dtype(s) or s.dtype == object:
+            if s.nunique() < MAX_CATEGORY_RATIO * len(s):
+                out[col] = s.astype("category")
+        elif pd.api.types.is_integer_dtype(s):
+            out[col] = pd.to_numeric(s, downcast="integer")
+        elif col in SCORE_COLUMNS:
+            # Amount stays float64 so funding totals are exact.
+            out[col] = s.astype("float32")
+    return out
+
+
+def memory_report(before, after):
+    """Per-column deep memory (bytes) of two versions of the frame, with a total row."""
+    rep = pd.DataFrame({
+        "before": before.memory_usage(deep=True),
+        "after":  after.memory_usage(deep=True),
+    }).fillna(0).astype("int64")
+    rep.loc["Total"] = rep.sum()
+    rep["saved"] = rep["before"] - rep["after"]
+    return rep
+
+
+# Snapshot cache
+# The cleaned frame is stored as an uncompressed Arrow IPC file named after the
+# CSV's content hash, so later loads memory-map it instead of re-parsing.
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _manifest_path(snapshot_dir):
+    return os.path.join(snapshot_dir, "manifest.json")
+
+
+def _read_manifest(snapshot_dir):
+    try:
+        with open(_manifest_path(snapshot_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(path, snapshot_dir, fp, **outputs):
+    """Record the source fingerprint and what was built from it (kept while the hash matches).
+
+    Written only when its contents change, and best effort: on a read-only
+    deploy a stale manifest only means the CSV is hashed again.
+    """
+    size, mtime_ns, sha = fp
+    old = _read_manifest(snapshot_dir)
+    manifest = {**(old if old.get("sha256") == sha else {}), **outputs,
+                "source": os.path.abspath(path), "size": size, "mtime_ns": mtime_ns, "sha256": sha}
+    if manifest == old:
+        return
+    tmp = f"{_manifest_path(snapshot_dir)}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, _manifest_path(snapshot_dir))
+    except OSError:
+        pass
+
+
+def fingerprint(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """(size, mtime_ns, sha256) of the source file; the hash is reused while size & mtime match."""
+    info = os.stat(path)
+    m = _read_manifest(snapshot_dir)
+    if m.get("source") == os.path.abspath(path) and \
+       m.get("size") == info.st_size and m.get("mtime_ns") == info.st_mtime_ns:
+        return info.st_size, info.st_mtime_ns, m["sha256"]
+    return info.st_size, info.st_mtime_ns, _sha256(path)
+
+
+def snapshot_path(sha, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"startup-{sha[:16]}.arrow")
+
+
+def build_snapshot(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, force=False, fp=None):
+    """Clean the CSV and write its snapshot; returns the snapshot path."""
+    size, mtime_ns, sha = fp or fingerprint(path, snapshot_dir)
+    out = snapshot_path(sha, snapshot_dir)
+    built = {}
+    if force or not os.path.exists(out):
+        df = clean(pd.read_csv(path))
+        built["parse_report"] = df.attrs["parse_report"]
+        os.makedirs(snapshot_dir, exist_ok=True)
+        tmp = f"{out}.{os.getpid()}.tmp"
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, out)
+        for name in os.listdir(snapshot_dir):
+            if name.startswith("startup-") and name != os.path.basename(out):
+                os.remove(os.path.join(snapshot_dir, name))
+
+    _write_manifest(path, snapshot_dir, (size, mtime_ns, sha), snapshot=os.path.basename(out), **built)
+    return out
+
+
+@perf.timed("read_dataset")
+def read_dataset(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, compact_schema=False,
+                 delta_dir=DELTA_DIR):
+    """Cleaned dataset, served from the snapshot (built on first use), plus any deltas.
+
+    ``df.attrs["version"]`` identifies the source content, deltas and schema;
+    derived structures (filter index, ...) are cached under it.
+    """
+    fp = fingerprint(path, snapshot_dir)
+    try:
+        snap = build_snapshot(path, snapshot_dir, fp=fp)
+        df = feather.read_table(snap, memory_map=True).to_pandas()
+    except OSError:
+        # Read-only deploy without a (readable) prebuilt snapshot: clean in memory.
+        df = clean(pd.read_csv(path))
+    return _finish(df, fp[2][:16], compact_schema, snapshot_dir, delta_dir)
+
+
+# Year-partitioned store: the CSV is cleaned chunk by chunk into one Parquet
+# directory per Year, so ingest memory is bounded by CHUNK_ROWS and readers
+# load only the years they need.
+def store_path(sha, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"partitions-{sha[:16]}")
+
+
+def ingest(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, chunk_rows=CHUNK_ROWS, force=False, fp=None):
+    """Stream the CSV through ``clean`` into the Year-partitioned store; returns its path."""
+    fp = fp or fingerprint(path, snapshot_dir)
+    out = store_path(fp[2], snapshot_dir)
+    built = {}
+    if force or not os.path.exists(out):
+        tmp = f"{out}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        schemas, report = [], {}
+        for i, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows)):
+            chunk = clean(chunk)
+            for kind, counts in chunk.attrs["parse_report"].items():
+                for k, n in counts.items():
+                    report.setdefault(kind, {}).setdefault(k, 0)
+                    report[kind][k] += n
+            for year, part in chunk.groupby("Year"):
+                table = pa.Table.from_pandas(part, preserve_index=False)
+                os.makedirs(os.path.join(tmp, f"year={year}"), exist_ok=True)
+                pq.write_table(table, os.path.join(tmp, f"year={year}", f"part-{i:05d}.parquet"))
+                schemas.append(table.schema)
+        # Chunks infer dtypes independently (e.g. int vs float); readers cast to the union.
+        schema = pa.unify_schemas(schemas, promote_options="permissive") if schemas \
+                 else pa.Table.from_pandas(clean(pd.read_csv(path, nrows=0))).schema
+        pq.write_table(schema.empty_table(), os.path.join(tmp, "_schema.parquet"))
+        shutil.rmtree(out, ignore_errors=True)
+        os.replace(tmp, out)
+        for name in os.listdir(snapshot_dir):
+            if name.startswith("partitions-") and name != os.path.basename(out):
+                shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+        built["parse_report"] = report
+    _write_manifest(path, snapshot_dir, fp, partitions=os.path.basename(out), **built)
+    return out
+
+
+def store_years(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """Years present in the partitioned store (ingesting the CSV first if needed)."""
+    try:
+        store = ingest(path, snapshot_dir)
+    except OSError:
+        # Read-only deploy without a prebuilt store.
+        return sorted(int(y) for y in clean(pd.read_csv(path))["Year"].unique())
+    return sorted(int(name.split("=", 1)[1]) for name in os.listdir(store)
+                  if name.startswith("year="))
+
+
+@perf.timed("read_partitions")
+def read_partitions(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, years=None, compact_schema=False,
+                    delta_dir=DELTA_DIR):
+    """Cleaned rows of the given years (all if None), read from the partitioned store."""
+    fp = fingerprint(path, snapshot_dir)
+    try:
+        store = ingest(path, snapshot_dir, fp=fp)
+    except OSError:
+        # Read-only deploy without a prebuilt store: clean in memory.
+        df = clean(pd.read_csv(path))
+        if years is not None:
+            df = df[df["Year"].isin(years)].reset_index(drop=True)
+    else:
+        schema = pq.read_schema(os.path.join(store, "_schema.parquet"))
+        dirs = sorted(name for name in os.listdir(store) if name.startswith("year=")
+                      and (years is None or int(name.split("=", 1)[1]) in years))
+        files = [os.path.join(store, d, f) for d in dirs
+                 for f in sorted(os.listdir(os.path.join(store, d)))]
+        df = ds.dataset(files, schema=schema, format="parquet").to_table().to_pandas()
+        df.attrs["parse_report"] = _read_manifest(snapshot_dir).get("parse_report")   # of the whole CSV
+    version = fp[2][:16] + ("" if years is None else "-y" + "-".join(map(str, sorted(years))))
+    return _finish(df, version, compact_schema, snapshot_dir, delta_dir, years)
+
+
+# Append mode: each delta CSV is cleaned once (cached as an Arrow file next to
+# the snapshot) and merged into the last merged frame of the same base, so a
+# refresh parses and cleans only the files added since. The merged frame is a
+# new copy; derived indexes extend their parent version's (attrs "parent").
+_merged      = OrderedDict()   # base version -> (delta hashes, merged frame, sorted row keys)
+_delta_shas  = {}              # (path, size, mtime_ns) -> sha256
+_merged_lock = threading.Lock()
+
+
+def delta_files(delta_dir=DELTA_DIR):
+    """(name, size, mtime_ns) of the delta CSVs, in the order they are applied."""
+    if not os.path.isdir(delta_dir):
+        return ()
+    files = []
+    for name in sorted(os.listdir(delta_dir)):
+        if name.endswith(".csv"):
+            info = os.stat(os.path.join(delta_dir, name))
+            files.append((name, info.st_size, info.st_mtime_ns))
+    return tuple(files)
+
+
+def row_keys(df):
+    """Per-row hash of DEDUP_KEY."""
+    key = df[DEDUP_KEY].astype({"Date": "datetime64[ns]", "Startup": str, "Amount": "float64",
+                                "Investors": str})
+    return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+
+def read_delta(path, sha, snapshot_dir=SNAPSHOT_DIR):
+    """Cleaned rows of one delta CSV, cached as an Arrow file keyed by its hash."""
+    out = os.path.join(snapshot_dir, f"delta-{sha[:16]}.arrow")
+    try:
+        return feather.read_table(out).to_pandas()
+    except OSError:
+        pass
+    df = clean(pd.read_csv(path))
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        tmp = f"{out}.{os.getpid()}.tmp"
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, out)
+    except OSError:
+        pass
+    return df
+
+
+def add_reports(a, b):
+    """Sum of two ``parse_report`` dicts (either may be None)."""
+    if not a or not b:
+        return a or b
+    return {kind: {k: a.get(kind, {}).get(k, 0) + b.get(kind, {}).get(k, 0)
+                   for k in {**a.get(kind, {}), **b.get(kind, {})}}
+            for kind in {**a, **b}}
+
+
+def apply_deltas(df, delta_dir=DELTA_DIR, snapshot_dir=SNAPSHOT_DIR, years=None):
+    """``df`` (versioned) plus the rows of every delta CSV not already in it.
+
+    The result's attrs name its ``parent`` version and the number of rows
+    ``appended`` after the parent's, so derived structures can be extended
+    instead of rebuilt. Its ``parse_report`` adds up those of ``df`` and the
+    deltas.
+    """
+    files = delta_files(delta_dir)
+    if not files:
+        return df
+    shas = []
+    for name, size, mtime_ns in files:
+        path = os.path.join(delta_dir, name)
+        if (path, size, mtime_ns) not in _delta_shas:
+            _delta_shas[(path, size, mtime_ns)] = _sha256(path)
+        shas.append(_delta_shas[(path, size, mtime_ns)])
+
+    base = df.attrs["version"]
+    with _merged_lock:
+        applied, merged, keys = _merged.get(base, ([], df, None))
+    if shas[:len(applied)] != applied:
+        applied, merged, keys = [], df, None
+    if keys is None:
+        keys = np.sort(row_keys(df))
+    if len(applied) == len(shas):
+        return merged
+
+    parent, new = merged.attrs["version"], []
+    report = merged.attrs.get("parse_report")
+    for (name, *_), sha in zip(files[len(applied):], shas[len(applied):]):
+        rows = read_delta(os.path.join(delta_dir, name), sha, snapshot_dir)
+        report = add_reports(report, rows.attrs.get("parse_report"))
+        if years is not None:
+            rows = rows[rows["Year"].isin(years)]
+        k = row_keys(rows)
+        pos = np.minimum(np.searchsorted(keys, k), max(len(keys) - 1, 0))
+        seen = keys[pos] == k if len(keys) else np.zeros(len(k), dtype=bool)
+        fresh = ~seen & ~pd.Series(k).duplicated().to_numpy()
+        new.append(rows[fresh])
+        added = np.sort(k[fresh])
+        keys = np.insert(keys, np.searchsorted(keys, added), added)   # merge, no re-sort
+
+    added = pd.concat(new, ignore_index=True)
+    merged = pd.concat([merged, added], ignore_index=True)
+    digest = hashlib.sha256("".join(shas).encode()).hexdigest()
+    merged.attrs = {"version": f"{base}+{digest[:12]}", "parent": parent, "appended": len(added),
+                    "parse_report": report}
+    with _merged_lock:
+        _merged[base] = (shas, merged, keys)
+        _merged.move_to_end(base)
+        while len(_merged) > 4:
+            _merged.popitem(last=False)
+    return merged
+
+
+def _finish(df, version, compact_schema, snapshot_dir, delta_dir, years=None):
+    df.attrs["version"] = version
+    df = apply_deltas(df, delta_dir, snapshot_dir, years)
+    if compact_schema:
+        attrs = dict(df.attrs)
+        df = compact(df)
+        df.attrs = {k: f"{v}-compact" if k in ("version", "parent") else v
+                    for k, v in attrs.items()}
     return df
 
 
+# Shared dataset: for several server processes on one host. The finished frame
+# is published once as an Arrow file laid out so that every column converts to
+# pandas without a copy and with the dtypes of the private frame (strings stay
+# Arrow-backed str, categoricals of the compact schema get pandas-width
+# dictionary indices, float nulls become NaN); each process memory-maps it read-only, so
+# the pages are shared through the OS page cache. A pointer file names the
+# current version; a changed CSV, delta set or schema publishes a new file and
+# swaps the pointer, and processes attach to the new file on their next run.
+def _shared_pointer(snapshot_dir):
+    return os.path.join(snapshot_dir, "shared.json")
+
+
+def _read_pointer(snapshot_dir):
+    try:
+        with open(_shared_pointer(snapshot_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _shared_inputs(path, compact_schema, deltas, source=None):
+    """What the published frame was built from, in the pointer's JSON form."""
+    if source is None:
+        info = os.stat(path)
+        source = info.st_size, info.st_mtime_ns
+    return json.loads(json.dumps({"source": os.path.abspath(path), "size": source[0],
+                                  "mtime_ns": source[1], "deltas": deltas,
+                                  "compact": compact_schema}))
+
+
+@contextmanager
+def _publish_lock(snapshot_dir):
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(snapshot_dir, "shared.lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _index_type(n):
+    """Dictionary index type pandas uses for the codes of ``n`` categories."""
+    return pa.int8() if n < 127 else pa.int16() if n < 32767 else pa.int32()
+
+
+def shareable(df):
+    """Arrow table of ``df`` whose columns all convert back to pandas without a copy."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    cols = []
+    for field, col in zip(table.schema, table.columns):
+        col = col.combine_chunks()
+        t = field.type
+        if pa.types.is_dictionary(t):
+            col = col.cast(pa.dictionary(_index_type(len(col.dictionary)), t.value_type, t.ordered))
+        elif pa.types.is_floating(t) and col.null_count:
+            col = pc.fill_null(col, float("nan"))
+        cols.append(col)
+    attrs = json.dumps(df.attrs, default=str).encode()
+    return pa.Table.from_arrays(cols, names=table.column_names, metadata={b"dash.attrs": attrs})
+
+
+@perf.timed("publish_shared")
+def publish_shared(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, compact_schema=COMPACT,
+                   delta_dir=DELTA_DIR, force=False):
+    """Publish the dataset for sharing if it is out of date; returns the pointer."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    inputs = _shared_inputs(path, compact_schema, delta_files(delta_dir))
+    with _publish_lock(snapshot_dir):
+        old = _read_pointer(snapshot_dir)
+        if not force and old.get("inputs") == inputs:
+            return old
+        df = read_dataset(path, snapshot_dir, compact_schema, delta_dir)
+        name = f"shared-{df.attrs['version']}.arrow"
+        out = os.path.join(snapshot_dir, name)
+        tmp = f"{out}.{os.getpid()}.tmp"
+        table = shareable(df)
+        with pa.OSFile(tmp, "wb") as f, ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, out)
+
+        pointer = {"file": name, "version": df.attrs["version"], "rows": len(df), "inputs": inputs}
+        tmp = f"{_shared_pointer(snapshot_dir)}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(pointer, f, indent=2)
+        os.replace(tmp, _shared_pointer(snapshot_dir))
+        # Keep the previous version for processes that read the old pointer a moment
+        # ago; mappings of removed files stay valid until they are released.
+        keep = {name, old.get("file")}
+        for other in os.listdir(snapshot_dir):
+            if other.startswith("shared-") and other.endswith(".arrow") and other not in keep:
+                try:
+                    os.remove(os.path.join(snapshot_dir, other))
+                except OSError:
+                    pass
+    return pointer
+
+
+def attach(path):
+    """Read-only, zero-copy frame over a published file (the versioned path)."""
+    table = ipc.open_file(pa.memory_map(path)).read_all()
+    df = table.to_pandas(split_blocks=True, self_destruct=False)
+    df.attrs = json.loads(table.schema.metadata[b"dash.attrs"])
+    return df
+
+
+@st.cache_resource(max_entries=2)
+@perf.timed("attach_shared")
+def _attached(path):
+    return attach(path)
+
+
+def load_shared(compact_schema=COMPACT, deltas=(), source=None, path=DATA_PATH,
+                snapshot_dir=SNAPSHOT_DIR, delta_dir=DELTA_DIR):
+    """The dataset mapped from the shared file, published first if it is out of date.
+
+    ``deltas`` and ``source`` are the inputs wanted (as for ``load_data``;
+    ``source`` defaults to the file's current size and mtime). One frame per
+    process and version, not a copy per session: callers must not modify it
+    in place.
+    """
+    pointer = _read_pointer(snapshot_dir)
+    try:
+        if pointer.get("inputs") != _shared_inputs(path, compact_schema, deltas, source):
+            pointer = publish_shared(path, snapshot_dir, compact_schema, delta_dir)
+        return _attached(os.path.join(snapshot_dir, pointer["file"]))
+    except OSError:
+        # Read-only deploy without a published file.
+        return load_data(compact_schema, deltas=deltas, source=source)
+
+
+@st.cache_data(max_entries=16)
+def load_data(compact_schema=COMPACT, years=None, deltas=(), source=None):
+    """Cleaned dataset; ``years`` (partitioned store only) limits it to those years.
+
+    ``deltas`` is ``delta_files()`` and ``source`` the CSV's (size, mtime_ns):
+    a new delta or a changed CSV changes the cache key.
+    """
+    if PARTITIONED:
+        return read_partitions(years=years, compact_schema=compact_schema)
+    return read_dataset(compact_schema=compact_schema)
+
+
 def fmt(n):
     """Human-readable money format."""
     if n >= 1e9:  return f"${n/1e9:.2f}B"
     if n >= 1e6:  return f"${n/1e6:.1f}M"
     if n >= 1e3:  return f"${n/1e3:.0f}K"
     return f"${n:,.0f}"
+
+
+FMT_TIERS = [(1e9, 2, "B"), (1e6, 1, "M"), (1e3, 0, "K"), (0, 0, "")]   # (from, decimals, suffix), as in fmt()
+
+
+def fmt_column(values):
+    """fmt() for a whole column, without a Python call per row.
+
+    Whole-dollar amounts round in integers: ``divmod(amount, unit)`` with the
+    tier's unit (1e7 for B, 1e5 for M, 1e3 for K). The few rows fmt() itself
+    must decide go through fmt(): exact halves (2,450,000 is 2.45M, whose
+    double rounds up), cents, negatives and NaN.
+    """
+    s = pd.Series(values)
+    v = s.to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        tier = np.select([v >= start for start, _, _ in FMT_TIERS], np.arange(len(FMT_TIERS)), -1)
+    decimals = np.array([d for _, d, _ in FMT_TIERS])[tier]
+    unit = np.array([max(int(start), 1) // 10**d for start, d, _ in FMT_TIERS])[tier]
+    whole = (tier >= 0) & (np.floor(v) == v) & (v < 2.0**62)
+    units, rest = np.divmod(np.where(whole, v, 0).astype(np.int64), unit)
+    units += 2 * rest > unit
+    slow = ~whole | ((unit > 1) & (2 * rest == unit))
+
+    step = 10 ** decimals
+    text = pd.Series(units // step, index=s.index, dtype="int64[pyarrow]").astype("str")
+    frac = pd.Series(units % step, index=s.index, dtype="int64[pyarrow]").astype("str").str.pad(2, fillchar="0")
+    frac = frac.where(decimals == 2, frac.str[-1:])
+    text = "$" + text + ("." + frac).where(decimals > 0, "") \
+         + pd.Series(np.array([x for _, _, x in FMT_TIERS])[tier], index=s.index)
+    if slow.any():
+        text.iloc[np.flatnonzero(slow)] = [fmt(n) for n in v[slow]]
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dataset maintenance for the funding dashboard.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    snap = sub.add_parser("snapshot", help="prebuild the cleaned columnar snapshot")
+    snap.add_argument("--source", default=DATA_PATH)
+    snap.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    snap.add_argument("--force", action="store_true", help="rebuild even if up to date")
+
+    part = sub.add_parser("ingest", help="stream the CSV into the Year-partitioned store")
+    part.add_argument("--source", default=DATA_PATH)
+    part.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    part.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    part.add_argument("--force", action="store_true", help="rebuild even if up to date")
+
+    parse = sub.add_parser("parse", help="report rows matched per date format and parse time")
+    parse.add_argument("--source", default=DATA_PATH)
+    parse.add_argument("--repeat", type=int, default=1, help="time on the data repeated N times")
+
+    mem = sub.add_parser("memory", help="report memory saved by the compact schema")
+    mem.add_argument("--source", default=DATA_PATH)
+    mem.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+
+    share = sub.add_parser("share", help="publish the dataset for DASH_SHARED=1 processes")
+    share.add_argument("--source", default=DATA_PATH)
+    share.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    share.add_argument("--compact", action="store_true", default=COMPACT)
+    share.add_argument("--force", action="store_true", help="republish even if up to date")
+
+    args = parser.parse_args(argv)
+    if args.command == "snapshot":
+        print(build_snapshot(args.source, args.snapshot_dir, force=args.force))
+    elif args.command == "ingest":
+        print(ingest(args.source, args.snapshot_dir, args.chunk_rows, force=args.force))
+    elif args.command == "parse":
+        raw = pd.read_csv(args.source)
+        raw = pd.concat([raw] * args.repeat, ignore_index=True) if args.repeat > 1 else raw
+        t0 = time.perf_counter()
+        df = clean(raw)
+        print(f"cleaned {len(raw):,} rows in {time.perf_counter() - t0:.2f}s")
+        for kind, counts in df.attrs["parse_report"].items():
+            print(f"\n{kind}:")
+            for k, n in counts.items():
+                print(f"  {k:<10} {n:>10,}")
+    elif args.command == "memory":
+        df = read_dataset(args.source, args.snapshot_dir)
+        rep = memory_report(df, compact(df))
+        print(rep.to_string())
+        print(f"\n{rep.loc['Total','before']/rep.loc['Total','after']:.1f}x smaller")
+    elif args.command == "share":
+        pointer = publish_shared(args.source, args.snapshot_dir, args.compact, force=args.force)
+        out = os.path.join(args.snapshot_dir, pointer["file"])
+        before = pa.total_allocated_bytes()
+        df = attach(out)
+        copied = pa.total_allocated_bytes() - before
+        private = read_dataset(args.source, args.snapshot_dir, args.compact)
+        print(out)
+        print(f"{len(df):,} rows, {os.path.getsize(out) / 2**20:.1f} MB mapped; "
+              f"{copied / 2**20:.2f} MB copied per process "
+              f"(a private frame: {private.memory_usage(deep=True).sum() / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
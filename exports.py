@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import io
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+import perf
+
+# Download exports. Nothing is serialized while a page renders: each button
+# hands Streamlit a callable that runs only when it is clicked. The file is
+# written in row chunks (so no full-frame CSV string is ever built) to
+# .exports/, keyed by the data version, filter selection and the page and
+# button that asked for it, and later clicks on the same selection are served
+# from there. If .exports/ cannot be written (read-only deploy), the file is
+# built in memory instead. Either way the finished file is handed to Streamlit
+# as bytes: its media file manager keeps a whole download in memory until the
+# browser has fetched it, whatever is passed to st.download_button.
+EXPORT_DIR = ".exports"
+CHUNK_ROWS = 50_000
+MAX_FILES  = 64
+
+FORMATS = {   # name: (file extension, mime type)
+    "CSV":     (".csv",     "text/csv"),
+    "CSV.gz":  (".csv.gz",  "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+_lock = threading.Lock()
+
+
+def _write_csv(df, f):
+    for start in range(0, max(len(df), 1), CHUNK_ROWS):
+        df.iloc[start:start + CHUNK_ROWS].to_csv(f, header=start == 0, index=False)
+
+
+def write(df, f, fmt):
+    """Write ``df`` to the binary file ``f`` in ``fmt``, CHUNK_ROWS rows at a time."""
+    if fmt == "CSV":
+        _write_csv(df, f)
+    elif fmt == "CSV.gz":
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6) as gz:
+            _write_csv(df, gz)
+    elif fmt == "Parquet":
+        writer = None
+        for start in range(0, max(len(df), 1), CHUNK_ROWS):
+            table = pa.Table.from_pandas(df.iloc[start:start + CHUNK_ROWS], preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(f, table.schema, compression="zstd")
+            writer.write_table(table)
+        writer.close()
+    else:
+        raise ValueError(f"unknown export format {fmt!r}")
+
+
+def export_path(key, fmt, export_dir=EXPORT_DIR):
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+    return os.path.join(export_dir, digest + FORMATS[fmt][0])
+
+
+def _prune(export_dir):
+    files = sorted((os.path.join(export_dir, f) for f in os.listdir(export_dir)
+                    if not f.endswith(".tmp")), key=os.path.getmtime)
+    for path in files[:-MAX_FILES]:
+        os.remove(path)
+
+
+def export(df, fmt, key=None, export_dir=EXPORT_DIR):
+    """Bytes of ``df`` in ``fmt``; cached on disk under ``key`` (None: not cached)."""
+    with perf.stage(f"export {fmt}", rows=len(df)) as s:
+        if key is None:
+            buf = io.BytesIO()
+            write(df, buf, fmt)
+            data = buf.getvalue()
+        else:
+            try:
+                data = _cached(df, fmt, export_path(key, fmt, export_dir), export_dir)
+            except OSError:
+                # Read-only deploy: build the file in memory.
+                return export(df, fmt)
+        s.note(bytes=len(data))
+    return data
+
+
+def _cached(df, fmt, path, export_dir):
+    if not os.path.exists(path):
+        os.makedirs(export_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                write(df, f, fmt)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with _lock:
+            _prune(export_dir)
+    else:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def download_buttons(df, label, stem, *key_parts, page):
+    """One download button per format, for ``df`` saved as ``stem`` + extension.
+
+    Files are produced on click and cached under the frame's filter key, the
+    ``page`` offering them, the label and stem, and ``key_parts`` (anything
+    else that tells apart the same selection).
+    """
+    fkey = df.attrs.get("filter_key")
+    key = None if fkey is None else (fkey, page, label, stem, *key_parts)
+    for col, fmt in zip(st.columns(len(FORMATS)), FORMATS):
+        ext, mime = FORMATS[fmt]
+        col.download_button(f"{label} ({fmt})", lambda fmt=fmt: export(df, fmt, key),
+                            stem + ext, mime, on_click="ignore", key=f"dl-{stem}-{fmt}")
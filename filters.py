@@ -1,19 +1,162 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
 import streamlit as st
 
-def apply_filters(df):
-    all_years      = ["All"] + sorted(df["Year"].unique())
-    all_cities     = ["All"] + sorted(df["City"].unique())
-    all_industries = ["All"] + sorted(df["Industry"].unique())
-    all_rounds     = sorted(df["Funding_Round"].unique())
+import perf
+
+FILTER_COLUMNS = ["Year", "Industry", "City", "Funding_Round"]
+
+
+class FilterIndex:
+    """Pre-sorted options and per-value row positions for each sidebar filter.
+
+    Built once per loaded dataset; a selection then costs O(rows matched by the
+    narrowest filter) instead of one full column scan per filter. Given the
+    index of a ``parent`` frame that ``df`` extends with appended rows, only
+    those rows are factorized; the parent's codes and positions are renumbered.
+    """
+
+    def __init__(self, df, parent=None):
+        start = 0 if parent is None else parent.size
+        self.size      = len(df)
+        self.options   = {}   # col -> sorted distinct values
+        self.codes     = {}   # col -> per-row value code
+        self.lookup    = {}   # col -> value -> code
+        self.positions = {}   # col -> code -> sorted row positions
+        for col in FILTER_COLUMNS:
+            codes, values = pd.factorize(df[col].iloc[start:], sort=True)
+            values = np.asarray(values).tolist()
+            if parent is not None:
+                # Renumber both sides into the union of values (-1, a null, stays -1).
+                old    = parent.options[col]
+                merged = sorted(set(old).union(values))
+                lookup = {v: i for i, v in enumerate(merged)}
+                codes  = np.array([lookup[v] for v in values] + [-1], dtype=np.intp)[codes]
+                remap  = np.array([lookup[v] for v in old] + [-1], dtype=np.intp)
+                blocks = [np.empty(0, dtype=np.intp)] * len(merged)
+                for code, block in zip(remap, parent.positions[col]):
+                    blocks[code] = block
+                values = merged
+            order  = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+            self.options[col]   = values
+            self.lookup[col]    = {v: i for i, v in enumerate(values)}
+            if parent is None:
+                self.codes[col]     = codes
+                self.positions[col] = [order[bounds[i]:bounds[i+1]] for i in range(len(values))]
+            else:
+                self.codes[col]     = np.concatenate([remap[parent.codes[col]], codes])
+                self.positions[col] = [np.concatenate([blocks[i], start + order[bounds[i]:bounds[i+1]]])
+                                       for i in range(len(values))]
+
+    def _rows(self, col, value):
+        code = self.lookup[col].get(value)
+        return np.empty(0, dtype=np.intp) if code is None else self.positions[col][code]
+
+    def select(self, year="All", industry="All", city="All", rounds=None):
+        """Sorted row positions matching the selection, or None for every row."""
+        picked = [(c, v) for c, v in zip(FILTER_COLUMNS, [year, industry, city]) if v != "All"]
+        picked.sort(key=lambda cv: len(self._rows(*cv)))
+
+        pos = None
+        for col, value in picked:
+            if pos is None:
+                pos = self._rows(col, value)
+            else:
+                pos = pos[self.codes[col][pos] == self.lookup[col].get(value, -1)]
+
+        all_rounds = self.options["Funding_Round"]
+        if rounds is not None and set(rounds) != set(all_rounds):
+            allowed = np.zeros(len(all_rounds), dtype=bool)
+            allowed[[self.lookup["Funding_Round"][r] for r in rounds
+                     if r in self.lookup["Funding_Round"]]] = True
+            if pos is None:
+                parts = [self.positions["Funding_Round"][i] for i in np.flatnonzero(allowed)]
+                pos = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+            else:
+                pos = pos[allowed[self.codes["Funding_Round"][pos]]]
+        return pos
+
+
+# Recent indexes by version, so a frame with appended rows (see
+# data_loader.apply_deltas) extends its parent's index instead of rebuilding.
+_recent = OrderedDict()
+_lock   = threading.Lock()
+
+
+@st.cache_resource(max_entries=4)
+def load_filter_index(_df, version):
+    with _lock:
+        parent = _recent.get(_df.attrs.get("parent"))
+    index = FilterIndex(_df, parent)
+    with _lock:
+        _recent[version] = index
+        while len(_recent) > 4:
+            _recent.popitem(last=False)
+    return index
 
+
+def get_filter_index(df):
+    """Filter index for the full loaded frame, cached by its data version."""
+    version = df.attrs.get("version")
+    return FilterIndex(df) if version is None else load_filter_index(df, version)
+
+
+def filter_key(df, year="All", industry="All", city="All", rounds=None):
+    """Hashable identity of a selection on a given dataset version (None if unversioned)."""
+    version = df.attrs.get("version")
+    if version is None:
+        return None
+    return (version, year, industry, city, None if rounds is None else tuple(sorted(rounds)))
+
+
+@perf.timed("filter_frame")
+def filter_frame(df, year="All", industry="All", city="All", rounds=None, index=None):
+    """Rows of the full frame matching the selection (no UI).
+
+    The result carries its selection in ``attrs["filter_key"]``; aggregates
+    are memoized under it.
+    """
+    if index is None:
+        index = get_filter_index(df)
+    pos = index.select(year, industry, city, rounds)
+    fdf = df.copy(deep=False) if pos is None else df.take(pos)
+    fdf.attrs["filter_key"] = filter_key(df, year, industry, city, rounds)
+    return fdf
+
+
+def _filter_header():
+    st.markdown("## Filters")
+
+    if st.button("Reset Filters"):
+        for k in ["f_year","f_city","f_ind","f_round"]:
+            if k in st.session_state: del st.session_state[k]
+
+
+def select_year(years):
+    """Year filter on its own, for loaders that read only the selected year's partition."""
     with st.sidebar:
-        st.markdown("## Filters")
+        _filter_header()
+        return st.selectbox("Year", ["All"] + list(years), index=0)
+
 
-        if st.button("Reset Filters"):
-            for k in ["f_year","f_city","f_ind","f_round"]:
-                if k in st.session_state: del st.session_state[k]
+def apply_filters(df, year=None):
+    """Sidebar filters over ``df``; pass ``year`` when select_year() already rendered it."""
+    index = get_filter_index(df)
+    all_years      = ["All"] + index.options["Year"]
+    all_cities     = ["All"] + index.options["City"]
+    all_industries = ["All"] + index.options["Industry"]
+    all_rounds     = index.options["Funding_Round"]
 
-        year_filter  = st.selectbox("Year",            all_years,      index=0)
+    with st.sidebar:
+        if year is None:
+            _filter_header()
+            year_filter = st.selectbox("Year",         all_years,      index=0)
+        else:
+            year_filter = year
         ind_filter   = st.selectbox("Industry",        all_industries, index=0)
         city_filter  = st.selectbox("City",           all_cities,     index=0)
         round_filter = st.multiselect("Funding Round", all_rounds,     default=all_rounds)
@@ -27,12 +170,7 @@ def apply_filters(df):
         if active:
             st.info(f"{active} filter(s) active")
 
-    fdf = df[
-        (df["Year"] == year_filter if year_filter != "All" else True) &
-        (df["Industry"] == ind_filter if ind_filter != "All" else True) &
-        (df["City"] == city_filter if city_filter != "All" else True) &
-        df["Funding_Round"].isin(round_filter)
-    ]
+    fdf = filter_frame(df, year_filter, ind_filter, city_filter, round_filter, index=index)
 
     if active:
         st.sidebar.info(f"{active} filter(s) active · {len(fdf):,} rows")
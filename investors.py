@@ -0,0 +1,325 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import perf
+
+def canonical(names):
+    """Matching key for investor names: NFKC, case-folded, quotes and extra spaces removed."""
+    return (names.astype(str).str.normalize("NFKC").str.casefold()
+                 .str.replace(r"\s+", " ", regex=True).str.strip(" \"'"))
+
+
+class InvestorIndex:
+    """Normalized (deal, investor) table with a name -> deal-positions index.
+
+    Built once per dataset from the comma-separated ``Investors`` column, so
+    the investor list and an investor's portfolio are lookups instead of
+    full-column string scans. Names that differ only by case, quoting or
+    spacing share one entry, shown under their most common spelling. Given
+    the index of a ``parent`` frame that ``df`` extends with appended rows,
+    only those rows' investor lists are split and matched.
+    """
+
+    def __init__(self, df, parent=None):
+        start = 0 if parent is None else parent.size
+        self.size = len(df)
+        lists = df["Investors"].iloc[start:].astype(str).str.split(",")
+        lens  = lists.str.len().to_numpy()
+        raw   = pd.Series(np.concatenate(lists.to_numpy()) if len(lists) else [], dtype=object)
+        raw   = raw.str.strip().str.strip('"').str.strip()
+        pairs = pd.DataFrame({
+            "pos":  start + np.repeat(np.arange(len(lists)), lens),
+            "raw":  raw.to_numpy(),
+            "key":  canonical(raw).to_numpy(),
+        })
+        pairs = pairs[pairs["key"] != ""]
+
+        # Display name: most frequent spelling of each key; codes follow display order.
+        counts = pairs.groupby(["key","raw"]).size()
+        if parent is not None:
+            counts = pd.concat([parent.spellings, counts]).groupby(level=["key","raw"]).sum()
+        self.spellings = counts   # (deal, investor) entries per (key, spelling)
+        spelling = (counts.reset_index(name="n")
+                          .sort_values(["key","n","raw"], ascending=[True, False, True])
+                          .drop_duplicates("key").set_index("key")["raw"])
+        spelling = spelling.sort_values(kind="stable")
+        self.names  = spelling.tolist()
+        self.keys   = spelling.index.tolist()
+        self.lookup = {name: i for i, name in enumerate(self.names)}
+        self.by_key = dict(zip(self.keys, range(len(self.keys))))
+
+        # One row per (deal, investor), i.e. the exploded investor table.
+        table = pd.DataFrame({"code": pairs["key"].map(self.by_key).to_numpy(),
+                              "pos":  pairs["pos"].to_numpy()}).drop_duplicates()
+        if parent is not None:
+            remap = np.array([self.by_key[k] for k in parent.keys], dtype=np.int64)
+            table = pd.concat([parent.table.assign(code=remap[parent.table["code"].to_numpy()]), table],
+                              ignore_index=True)
+        self.table = table.sort_values(["code","pos"], ignore_index=True)
+        self.labels = df.index.to_numpy()[self.table["pos"].to_numpy()]
+        codes = self.table["code"].to_numpy()
+        self.bounds = np.searchsorted(codes, np.arange(len(self.names) + 1))
+
+        self._names_in = OrderedDict()
+        self._lock = threading.Lock()
+
+    def code(self, name):
+        code = self.lookup.get(name)
+        if code is None:
+            code = self.by_key.get(canonical(pd.Series([name])).iloc[0])
+        return code
+
+    def positions(self, name):
+        """Sorted row positions (in the indexed frame) of deals listing ``name``."""
+        code = self.code(name)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self.table["pos"].to_numpy()[self.bounds[code]:self.bounds[code+1]]
+
+    def rows(self, df, name):
+        """Deals of ``name`` within ``df`` (the indexed frame or a filtered slice of it)."""
+        code = self.code(name)
+        if code is None:
+            return df.iloc[:0]
+        labels = self.labels[self.bounds[code]:self.bounds[code+1]]
+        pos = df.index.get_indexer(labels)
+        return df.take(np.sort(pos[pos >= 0]))
+
+    def names_in(self, df):
+        """Sorted investor names appearing in ``df``; memoized by its filter key."""
+        if len(df) == self.size:
+            return self.names
+        key = df.attrs.get("filter_key")
+        with self._lock:
+            if key is not None and key in self._names_in:
+                return self._names_in[key]
+        present = np.isin(self.labels, df.index.to_numpy())
+        names = [self.names[c] for c in np.unique(self.table["code"].to_numpy()[present])]
+        if key is not None:
+            with self._lock:
+                self._names_in[key] = names
+                while len(self._names_in) > 32:
+                    self._names_in.popitem(last=False)
+        return names
+
+
+# Recent indexes by version, so a frame with appended rows (see
+# data_loader.apply_deltas) extends its parent's index instead of rebuilding.
+_recent = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+@st.cache_resource(max_entries=2)
+def load_investor_index(_df, version):
+    with _recent_lock:
+        parent = _recent.get(_df.attrs.get("parent"))
+    index = InvestorIndex(_df, parent)
+    with _recent_lock:
+        _recent[version] = index
+        while len(_recent) > 4:
+            _recent.popitem(last=False)
+    return index
+
+
+def get_investor_index(df):
+    """Investor index for the full loaded frame, cached by its data version."""
+    version = df.attrs.get("version")
+    return InvestorIndex(df) if version is None else load_investor_index(df, version)
+
+
+def portfolio(deals):
+    """KPIs and breakdowns of one investor's ``deals`` (as on the investor page)."""
+    return {
+        "total":       float(deals["Amount"].sum()),
+        "largest":     float(deals["Amount"].max()),
+        "companies":   int(deals["Startup"].nunique()),
+        "industries":  int(deals["Industry"].nunique()),
+        "power_score": float(deals["Power_Score_x"].mean()),
+        "influence":   float(deals["Influence_Index"].mean()),
+        "final_rank":  float(deals["Final_Rank"].mean()),
+        "by_industry": deals.groupby("Industry")["Amount"].sum().sort_values(ascending=False),
+        "by_year":     deals.groupby("Year").agg(Total=("Amount","sum"), Deals=("Amount","count")).reset_index(),
+        "stages":      deals["Funding_Round"].value_counts().loc[lambda c: c > 0],
+    }
+
+
+# Co-investment graph
+# A deal is the set of rows sharing DEAL_KEY (the feed has one row per investor
+# of a deal). The graph holds the investor x deal incidence matrix in CSR form,
+# both ways, and the investor x investor matrix of deals made together, built
+# once per dataset on top of the investor index, so rankings, co-investors and
+# syndicate sizes are array lookups rather than string work per request.
+DEAL_KEY     = ["Sr No", "Startup", "Date", "Amount"]
+UNDISCLOSED  = ["undisclosed", "undisclosed investor", "undisclosed investors"]   # left out of rankings
+MAX_RANKINGS = 32
+
+
+def _csr(rows, cols, n_rows, *data):
+    """(indptr, indices, *data) of the (row, col) entries, sorted by row then column."""
+    order = np.lexsort((cols, rows))
+    indptr = np.searchsorted(rows[order], np.arange(n_rows + 1))
+    return (indptr, cols[order], *(d[order] for d in data))
+
+
+def _ranges(starts, lens):
+    """Concatenation of ``arange(start, start + len)`` for each pair."""
+    offsets = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+    return np.repeat(starts, lens) + offsets
+
+
+def _mean_by(codes, values, n):
+    """Per-code mean of ``values``, NaNs skipped (NaN where a code has none)."""
+    ok = ~np.isnan(values)
+    total = np.bincount(codes[ok], weights=values[ok], minlength=n)
+    count = np.bincount(codes[ok], minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+class CoInvestmentGraph:
+    """Sparse investor x deal and investor x investor matrices of a dataset.
+
+    ``inv_ptr``/``inv_deals`` list each investor's deals and
+    ``deal_ptr``/``deal_investors`` each deal's investors (its syndicate, of
+    ``syndicate`` size). ``co_ptr``/``co_codes`` list each investor's
+    co-investors, with ``co_deals`` deals and ``co_amount`` funding shared.
+    Queries take the indexed frame or a filtered slice of it.
+    """
+
+    def __init__(self, df, index=None):
+        self.index = index if index is not None else InvestorIndex(df)
+        codes = self.index.table["code"].to_numpy()
+        pos   = self.index.table["pos"].to_numpy()
+        n_inv = len(self.index.names)
+
+        deal_of_row = df.groupby(DEAL_KEY, sort=False, dropna=False).ngroup().to_numpy()
+        n_deals = int(deal_of_row.max()) + 1 if len(df) else 0
+        self.deal_amount = np.zeros(n_deals)
+        self.deal_amount[deal_of_row] = df["Amount"].to_numpy(dtype="float64")
+
+        # Per (row, investor) entry of the index table, for aggregates over a slice.
+        self.codes      = codes
+        self.entry_deal = deal_of_row[pos]
+        self.amount     = df["Amount"].to_numpy(dtype="float64")[pos]
+        self.power      = df["Power_Score_x"].to_numpy(dtype="float64", na_value=np.nan)[pos]
+        self.influence  = df["Influence_Index"].to_numpy(dtype="float64", na_value=np.nan)[pos]
+
+        # Incidence: one entry per (investor, deal).
+        width = max(n_deals, 1)
+        inv, deal = np.divmod(np.unique(codes.astype(np.int64) * width + self.entry_deal), width)
+        self.inv_ptr, self.inv_deals       = _csr(inv, deal, n_inv)
+        self.deal_ptr, self.deal_investors = _csr(deal, inv, n_deals)
+        self.syndicate = np.diff(self.deal_ptr)
+
+        # Co-investment: every ordered pair of distinct investors of a deal.
+        deals = np.repeat(np.arange(n_deals), self.syndicate)
+        lens  = self.syndicate[deals]
+        left  = np.repeat(self.deal_investors, lens)
+        right = self.deal_investors[_ranges(self.deal_ptr[deals], lens)]
+        pair_deal = np.repeat(deals, lens)
+        keep = left != right
+        pairs, inverse = np.unique(left[keep].astype(np.int64) * max(n_inv, 1) + right[keep],
+                                   return_inverse=True)
+        shared = np.bincount(inverse, minlength=len(pairs))
+        amount = np.bincount(inverse, weights=self.deal_amount[pair_deal[keep]], minlength=len(pairs))
+        a, b = np.divmod(pairs, max(n_inv, 1))
+        self.co_ptr, self.co_codes, self.co_deals, self.co_amount = _csr(a, b, n_inv, shared, amount)
+
+        self.hidden = np.array([self.index.by_key[k] for k in UNDISCLOSED if k in self.index.by_key],
+                               dtype=np.int64)
+        self._rankings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _present(self, df):
+        """Mask of the index entries whose rows are in ``df`` (None: all of them)."""
+        if df is None or len(df) == self.index.size:
+            return None
+        return np.isin(self.index.labels, df.index.to_numpy())
+
+    def deals(self, name, df=None):
+        """Deal ids of ``name``, within ``df`` when given."""
+        code = self.index.code(name)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        deals = self.inv_deals[self.inv_ptr[code]:self.inv_ptr[code+1]]
+        present = self._present(df)
+        return deals if present is None else deals[np.isin(deals, self.entry_deal[present])]
+
+    def investor_stats(self, df=None):
+        """Per-investor aggregates over the rows of ``df``, one row per investor in it."""
+        n = len(self.index.names)
+        present = self._present(df)
+        pick = (lambda a: a) if present is None else (lambda a: a[present])
+        codes = pick(self.codes)
+        rows  = np.bincount(codes, minlength=n)
+        out = pd.DataFrame({
+            "Investors":     self.index.names,
+            "AvgPowerScore": _mean_by(codes, pick(self.power), n),
+            "AvgInfluence":  _mean_by(codes, pick(self.influence), n),
+            "TotalInvested": np.bincount(codes, weights=pick(self.amount), minlength=n),
+            "Deals":         rows,
+            "AvgSyndicate":  _mean_by(codes, self.syndicate[pick(self.entry_deal)].astype("float64"), n),
+        })
+        return out[rows > 0]
+
+    def ranking(self, df=None, k=15):
+        """Top ``k`` investors in ``df`` by average power score; memoized by its filter key."""
+        key = None if df is None else df.attrs.get("filter_key")
+        with self._lock:
+            if key is not None and key in self._rankings:
+                self._rankings.move_to_end(key)
+                return self._rankings[key]
+        with perf.stage("investor ranking", rows=None if df is None else len(df)):
+            stats = self.investor_stats(df)
+            stats = stats.drop(index=self.hidden, errors="ignore")
+            top = stats.sort_values("AvgPowerScore", ascending=False, kind="stable").head(k)
+            top = top.reset_index(drop=True)
+        if key is not None:
+            with self._lock:
+                self._rankings[key] = top
+                while len(self._rankings) > MAX_RANKINGS:
+                    self._rankings.popitem(last=False)
+        return top
+
+    def co_investors(self, name, df=None):
+        """Co-investors of ``name`` with the deals and funding shared, most deals first.
+
+        Read from the co-investment matrix, or from the deals in ``df`` when it
+        is a filtered slice.
+        """
+        code = self.index.code(name)
+        if code is None:
+            others = shared = amount = np.empty(0, dtype=np.int64)
+        elif self._present(df) is None:
+            lo, hi = self.co_ptr[code], self.co_ptr[code+1]
+            others, shared, amount = self.co_codes[lo:hi], self.co_deals[lo:hi], self.co_amount[lo:hi]
+        else:
+            deals = self.deals(name, df)
+            lens  = self.syndicate[deals]
+            invs  = self.deal_investors[_ranges(self.deal_ptr[deals], lens)]
+            amts  = np.repeat(self.deal_amount[deals], lens)
+            keep  = invs != code
+            others, inverse = np.unique(invs[keep], return_inverse=True)
+            shared = np.bincount(inverse, minlength=len(others))
+            amount = np.bincount(inverse, weights=amts[keep], minlength=len(others))
+        keep = ~np.isin(others, self.hidden)
+        others, shared, amount = others[keep], shared[keep], amount[keep]
+        order = np.lexsort((others, -amount, -shared))
+        return pd.DataFrame({"Investor":      [self.index.names[i] for i in others[order]],
+                             "Shared Deals":  shared[order].astype(np.int64),
+                             "Shared Amount": amount[order].astype("float64")})
+
+
+@st.cache_resource(max_entries=2)
+def load_investor_graph(_df, version):
+    return CoInvestmentGraph(_df, get_investor_index(_df))
+
+
+def get_investor_graph(df):
+    """Co-investment graph of the full loaded frame, cached by its data version."""
+    version = df.attrs.get("version")
+    return CoInvestmentGraph(df) if version is None else load_investor_graph(df, version)
@@ -0,0 +1,161 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+# Opt-in timing of the hot path: data load, filters, each aggregate, each chart
+# and the exports. Off unless DASH_PERF=1 or the page is opened with ?perf=1;
+# when off, a timed call costs one attribute lookup. Records (stage, ms, rows,
+# extras) go to a process-wide ring buffer shown in the sidebar "Performance"
+# panel, and are appended to DASH_PERF_LOG as JSON lines when that is set.
+ENABLED   = os.environ.get("DASH_PERF", "") == "1"
+RING_SIZE = int(os.environ.get("DASH_PERF_RING", "5000"))
+LOG_PATH  = os.environ.get("DASH_PERF_LOG")
+
+TOP_LEVEL = {"load_data", "apply_filters", "page"}   # stages that do not nest in each other
+
+_ring  = deque(maxlen=RING_SIZE)
+_lock  = threading.Lock()
+_local = threading.local()
+_runs  = itertools.count(1)
+
+
+def active():
+    """Whether the current script run is being timed."""
+    return getattr(_local, "active", ENABLED)
+
+
+def begin_run():
+    """Start a script run, timed if enabled for it; call once at the top of the app."""
+    _local.active = ENABLED or st.query_params.get("perf") == "1"
+    _local.run, _local.page = next(_runs), None
+
+
+def set_page(page):
+    _local.page = page
+
+
+def record(stage, ms, rows=None, **extra):
+    entry = {"ts": round(time.time(), 3), "run": getattr(_local, "run", 0),
+             "page": getattr(_local, "page", None), "stage": stage,
+             "ms": round(ms, 3), "rows": rows, **extra}
+    with _lock:
+        _ring.append(entry)
+        if LOG_PATH:
+            with open(LOG_PATH, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+
+class _Stage:
+    def __init__(self, name, rows):
+        self.name, self.extra = name, {"rows": rows}
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter() - self.t0) * 1000, **self.extra)
+        return False
+
+    def note(self, **extra):
+        """Attach row counts or other details known only inside the block."""
+        self.extra.update(extra)
+
+
+class _Off:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def note(self, **extra):
+        pass
+
+
+_OFF = _Off()
+
+
+def stage(name, rows=None):
+    """``with stage(name) as s:`` times the block (``s.note(rows=...)`` adds details)."""
+    return _Stage(name, rows) if active() else _OFF
+
+
+def _rows(value):
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+def timed(name):
+    """Decorator timing each call under ``name``; rows are the result's length."""
+    def wrap(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not active():
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            result = fn(*args, **kwargs)
+            record(name, (time.perf_counter() - t0) * 1000, rows=_rows(result))
+            return result
+        return wrapper
+    return wrap
+
+
+def records():
+    with _lock:
+        return list(_ring)
+
+
+def clear():
+    with _lock:
+        _ring.clear()
+
+
+def jsonl(entries=None):
+    """The ring buffer (or ``entries``) as JSON lines."""
+    return "".join(json.dumps(e, default=str) + "\n" for e in (records() if entries is None else entries))
+
+
+def summary(entries=None):
+    """Per-stage call count, cache hits and latency percentiles."""
+    df = pd.DataFrame(records() if entries is None else entries)
+    if df.empty:
+        return df
+    if "cached" not in df:
+        df["cached"] = None
+    by = df.groupby("stage", sort=False)
+    out = by["ms"].agg(calls="size", total_ms="sum", p50_ms="median",
+                       p95_ms=lambda s: s.quantile(0.95), max_ms="max")
+    out["hits"] = by["cached"].apply(lambda s: int((s == True).sum()))
+    return out.round(2).sort_values("total_ms", ascending=False)
+
+
+def panel(startup=None):
+    """Sidebar "Performance" panel (only while the run is timed).
+
+    ``startup`` is the server's warm-up step timings in seconds (warmup.start()).
+    """
+    if not active():
+        return
+    entries = records()
+    run = [e for e in entries if e["run"] == getattr(_local, "run", None)]
+    with st.sidebar.expander("Performance"):
+        st.caption(f"This run: {sum(e['ms'] for e in run if e['stage'] in TOP_LEVEL):.0f} ms, "
+                   f"{len(run)} stages · buffer: {len(entries)}/{RING_SIZE}")
+        st.dataframe(pd.DataFrame(run, columns=["stage", "ms", "rows", "cached"]),
+                     use_container_width=True, hide_index=True)
+        st.markdown("**All runs**")
+        st.dataframe(summary(entries), use_container_width=True)
+        st.download_button("Download JSONL", jsonl(entries), "perf.jsonl", "application/jsonl")
+        if startup:
+            steps = dict(startup)   # still filled in while the warm-up runs
+            st.markdown("**Server warm-up**")
+            st.dataframe(pd.DataFrame({"step": list(steps),
+                                       "ms": [round(s * 1000, 1) for s in steps.values()]}),
+                         use_container_width=True, hide_index=True)
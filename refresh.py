@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+import streamlit as st
+
+import data_loader
+import perf
+import warmup
+
+# Stale-while-revalidate refresh of the dataset. A watcher thread per server
+# process polls StartUp.csv and the delta directory every INTERVAL seconds;
+# when either changes it loads the new version and builds its derived caches
+# (filter index, cube, investor graph, ...) off the request path, then swaps
+# the served inputs in one step. Until then every rerun keeps loading the
+# version already served (a cache hit), so no visitor waits for the rebuild.
+# DASH_REFRESH_SECONDS=0 turns the watcher off: each rerun then loads the
+# current files directly.
+INTERVAL = float(os.environ.get("DASH_REFRESH_SECONDS", "10"))
+
+_lock  = threading.Lock()
+_state = {"inputs": None, "status": "idle", "checked": None, "refreshed": None,
+          "took": None, "error": None}
+
+
+def stamp(path=data_loader.DATA_PATH):
+    """Current inputs of the dataset: ((size, mtime_ns) of the CSV, delta_files())."""
+    info = os.stat(path)
+    return (info.st_size, info.st_mtime_ns), data_loader.delta_files()
+
+
+def served():
+    """Inputs of the version being served (the current files until the watcher runs)."""
+    with _lock:
+        inputs = _state["inputs"]
+    return inputs if inputs is not None and INTERVAL > 0 else stamp()
+
+
+def load(inputs=None, years=None):
+    """The dataset for ``inputs`` (default: the served version).
+
+    app.py, the warm-up and the watcher all load through here, so they share
+    one cache entry per version.
+    """
+    source, deltas = inputs or served()
+    if data_loader.PARTITIONED:
+        return data_loader.load_data(years=years, deltas=deltas, source=source)
+    if data_loader.SHARED:
+        # One memory-mapped frame for every server process on the host.
+        return data_loader.load_shared(deltas=deltas, source=source)
+    return data_loader.load_data(deltas=deltas, source=source)
+
+
+@st.cache_data(max_entries=4)
+def _years(source):
+    return data_loader.store_years()
+
+
+def years(inputs=None):
+    """Years of the partitioned store for ``inputs`` (default: the served version)."""
+    return _years((inputs or served())[0])
+
+
+def check():
+    """Rebuild and swap in the dataset if its files changed; True if it did."""
+    new = stamp()
+    with _lock:
+        _state["checked"] = time.time()
+        if new == _state["inputs"]:
+            return False
+        _state["status"] = "refreshing"
+    t0 = time.perf_counter()
+    try:
+        with perf.stage("refresh") as s:
+            if data_loader.PARTITIONED:
+                years(new)
+            df = load(new)
+            warmup.warm_caches(df)
+            s.note(rows=len(df), version=df.attrs.get("version"))
+    except Exception as e:   # keep serving the previous version
+        with _lock:
+            _state.update(status="failed", error=f"{type(e).__name__}: {e}")
+        return False
+    took = time.perf_counter() - t0
+    with _lock:
+        _state.update(inputs=new, status="idle", refreshed=time.time(), took=took, error=None)
+    return True
+
+
+def _watch():
+    while True:
+        time.sleep(INTERVAL)
+        check()
+
+
+@st.cache_resource
+def start():
+    """Start the watcher once per server process (if INTERVAL > 0)."""
+    if INTERVAL > 0:
+        with _lock:
+            _state["inputs"] = stamp()
+        threading.Thread(target=_watch, name="dash-refresh", daemon=True).start()
+    return _state
+
+
+def status(df):
+    """Sidebar line with the served data version and the watcher's state."""
+    with _lock:
+        state = dict(_state)
+    text = f"Data version `{df.attrs.get('version', 'unversioned')}`"
+    if state["status"] == "refreshing":
+        text += " · new data found, refreshing in the background"
+    elif state["refreshed"] is not None:
+        text += (f" · refreshed {time.strftime('%H:%M:%S', time.localtime(state['refreshed']))}"
+                 f" in {state['took']:.1f}s")
+    if state["checked"] is not None:
+        text += f" · checked {time.strftime('%H:%M:%S', time.localtime(state['checked']))}"
+    st.sidebar.caption(text)
+    if state["status"] == "failed":
+        st.sidebar.warning(f"Data refresh failed, serving the previous version: {state['error']}")
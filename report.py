@@ -0,0 +1,218 @@
+import argparse
+import base64
+import contextlib
+import html
+import json
+import os
+import shutil
+
+import streamlit
+
+import aggregates as agg
+import charts
+import data_loader
+import filters
+from analysis import load_overall_analysis
+from cube import build_cube
+from investors import CoInvestmentGraph
+from exports import download_buttons
+
+# Static export of the Overall Analysis page. The page is rendered once per
+# selection (no filters, and optionally each Year) against a recorder that
+# stands in for Streamlit and writes the same titles, metrics, charts and
+# tables into a self-contained HTML file, next to a JSON of its KPIs. The app
+# serves a bundle instead of re-running the page when its selection matches.
+REPORT_DIR = ".report"
+
+STYLE = """<style>
+  .report{font-family:"Source Sans Pro",sans-serif;color:#31333F;}
+  .report .row{display:flex;gap:1rem;}
+  .report .col{flex:1;min-width:0;}
+  .report .metric{background:#f0f2f6;border-radius:10px;padding:10px 14px;}
+  .report .metric .label{font-size:0.85rem;color:#555;}
+  .report .metric .value{font-size:1.8rem;}
+  .report img{width:100%;}
+  .report table{border-collapse:collapse;font-size:0.85rem;width:100%;}
+  .report th,.report td{border-bottom:1px solid #e6e6e6;padding:4px 8px;text-align:left;}
+</style>"""
+
+
+class _Block:
+    """One container of recorded output (the page, a column, ...)."""
+
+    def __init__(self, recorder):
+        self.parts, self.recorder = [], recorder
+
+    def __enter__(self):
+        self.recorder.stack.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.stack.pop()
+        return False
+
+    def title(self, text, *a, **k):
+        self.parts.append(f"<h1>{html.escape(text)}</h1>")
+
+    def subheader(self, text, *a, **k):
+        self.parts.append(f"<h3>{html.escape(text)}</h3>")
+
+    def markdown(self, text, *a, **k):
+        text = text.strip()
+        if text == "---":
+            self.parts.append("<hr>")
+        elif text.startswith("#"):
+            level = len(text) - len(text.lstrip("#"))
+            self.parts.append(f"<h{level}>{html.escape(text[level:].strip())}</h{level}>")
+        else:
+            self.parts.append(f"<p>{html.escape(text)}</p>")
+
+    def metric(self, label, value, *a, **k):
+        self.recorder.metrics.append({"label": label, "value": str(value)})
+        self.parts.append(f'<div class="metric"><div class="label">{html.escape(label)}</div>'
+                          f'<div class="value">{html.escape(str(value))}</div></div>')
+
+    def image(self, image, *a, **k):
+        if isinstance(image, str):
+            data, mime = image.encode(), "image/svg+xml"
+        else:
+            data, mime = image, "image/png"
+        self.parts.append(f'<img src="data:{mime};base64,{base64.b64encode(data).decode()}">')
+
+    def dataframe(self, df, *a, **k):
+        self.parts.append(df.to_html(index=False, border=0))
+
+    def success(self, text, *a, **k):
+        self.parts.append(f"<p>{html.escape(text)}</p>")
+
+    error = warning = info = success
+
+    def columns(self, spec, *a, **k):
+        cols = [_Block(self.recorder) for _ in range(spec if isinstance(spec, int) else len(spec))]
+        self.parts.append(cols)
+        return cols
+
+    def empty(self, *a, **k):
+        slot = _Block(self.recorder)
+        self.parts.append(slot)
+        return slot
+
+    def expander(self, *a, **k):
+        return _Block(self.recorder)   # interactive extras are left out
+
+    def download_button(self, *a, **k):
+        pass
+
+    def html(self):
+        out = []
+        for part in self.parts:
+            if isinstance(part, list):
+                out.append('<div class="row">' + "".join(
+                    f'<div class="col">{c.html()}</div>' for c in part) + "</div>")
+            elif isinstance(part, _Block):
+                out.append(part.html())
+            else:
+                out.append(part)
+        return "\n".join(out)
+
+
+class _Recorder:
+    def __init__(self):
+        self.metrics = []
+        self.stack = [_Block(self)]
+
+    def element(self, name):
+        """``st.<name>``: writes into the innermost open block (e.g. a column)."""
+        return lambda *a, **k: getattr(self.stack[-1], name)(*a, **k)
+
+
+RECORDED = ["title", "subheader", "markdown", "metric", "image", "dataframe", "success",
+            "error", "warning", "info", "columns", "empty", "expander", "download_button"]
+
+
+@contextlib.contextmanager
+def recording():
+    """Route the Streamlit elements used by the overview page into a recorder."""
+    rec, saved = _Recorder(), {name: getattr(streamlit, name) for name in RECORDED}
+    for name in RECORDED:
+        setattr(streamlit, name, rec.element(name))
+    try:
+        yield rec
+    finally:
+        for name, value in saved.items():
+            setattr(streamlit, name, value)
+
+
+def bundle_path(version, selection="all", report_dir=REPORT_DIR):
+    return os.path.join(report_dir, version, f"overview-{selection}")
+
+
+def render(fdf, cube, graph=None):
+    """(html, metrics) of the Overall Analysis page for the filtered frame ``fdf``."""
+    with recording() as rec, charts.using("matplotlib"):
+        load_overall_analysis(fdf, cube=cube, graph=graph)
+    page = rec.stack[0].html()
+    return f'{STYLE}\n<div class="report">\n{page}\n</div>', rec.metrics
+
+
+def build(df, years=False, report_dir=REPORT_DIR):
+    """Write bundles for the unfiltered page (and each Year); returns their paths."""
+    version = df.attrs["version"]
+    index, cube, graph = filters.FilterIndex(df), build_cube(df), CoInvestmentGraph(df)
+    selections = [("all", {})] + ([(str(y), {"year": y}) for y in index.options["Year"]]
+                                  if years else [])
+    out_dir = os.path.join(report_dir, version)
+    tmp = f"{out_dir}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    for name, sel in selections:
+        fdf = filters.filter_frame(df, index=index, **sel)
+        page, metrics = render(fdf, cube, graph)
+        base = os.path.join(tmp, f"overview-{name}")
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            f.write(page)
+        with open(base + ".json", "w") as f:
+            json.dump({"version": version, "selection": sel, "kpis": agg.kpis(fdf),
+                       "metrics": metrics}, f, indent=2)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+    for name in os.listdir(report_dir):
+        if name != version and os.path.isdir(os.path.join(report_dir, name)):
+            shutil.rmtree(os.path.join(report_dir, name), ignore_errors=True)
+    return [bundle_path(version, name, report_dir) for name, _ in selections]
+
+
+def find_bundle(df, fdf, report_dir=REPORT_DIR):
+    """Path (without extension) of a bundle matching ``fdf``'s selection, or None."""
+    key = fdf.attrs.get("filter_key")
+    if key is None:
+        return None
+    version, year, industry, city, rounds = key
+    all_rounds = filters.get_filter_index(df).options["Funding_Round"]
+    if industry != "All" or city != "All" or \
+       (rounds is not None and set(rounds) != set(all_rounds)):
+        return None
+    path = bundle_path(version, "all" if year == "All" else str(year), report_dir)
+    return path if os.path.exists(path + ".html") else None
+
+
+def show_bundle(path, fdf):
+    """Serve a pre-rendered overview (plus the data download, which the bundle leaves out)."""
+    with open(path + ".html", encoding="utf-8") as f:
+        streamlit.html(f.read())
+    download_buttons(fdf, "Download data", "startup_funding_filtered", page="overview")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render the Overall Analysis page.")
+    parser.add_argument("--years", action="store_true", help="also render one bundle per Year")
+    parser.add_argument("--compact", action="store_true", help="use the compact schema")
+    parser.add_argument("--out", default=REPORT_DIR)
+    args = parser.parse_args(argv)
+
+    df = data_loader.read_dataset(compact_schema=args.compact)
+    for path in build(df, args.years, args.out):
+        print(path + ".html")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+MAX_RESULTS = 50
+MIN_SIMILARITY = 0.3   # trigram Jaccard similarity for fuzzy matches
+
+
+def fold(text):
+    """Search key: accents, case, punctuation and spaces removed ("BYJU’S" -> "byjus")."""
+    text = unicodedata.normalize("NFKD", str(text)).casefold()
+    return re.sub(r"[\W_]+", "", text)
+
+
+def _trigrams(key, padded=False):
+    if padded:
+        key = f"  {key} "
+    return {key[i:i+3] for i in range(len(key) - 2)}
+
+
+class SearchIndex:
+    """Trigram and sorted-prefix index over a fixed list of names.
+
+    Built once per dataset; a query intersects the posting lists of its
+    trigrams, so its cost depends on how many names share those trigrams
+    rather than on the total number of names. Results are ranked exact,
+    prefix, then substring matches (shorter first), topped up with fuzzy
+    matches by trigram similarity when there are fewer than ``k``.
+
+    Posting lists are stored end to end, grouped by trigram. Given the index
+    of a ``parent`` name list, only names new to it are folded and split into
+    trigrams; the parent's postings are renumbered in one pass.
+    """
+
+    def __init__(self, names, parent=None):
+        self.names  = sorted(set(names))
+        self.lookup = {name: i for i, name in enumerate(self.names)}
+        old = {} if parent is None else parent.lookup
+        self.keys   = [parent.keys[old[n]] if n in old else fold(n) for n in self.names]
+        self.order  = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.sorted_keys = [self.keys[i] for i in self.order]
+
+        self.grams = {} if parent is None else dict(parent.grams)   # trigram -> its postings' slot
+        self.ntrigrams = np.zeros(len(self.keys), dtype=np.int32)
+        slots, ids = [], []
+        for i, name in enumerate(self.names):
+            if name in old:
+                continue
+            grams = _trigrams(self.keys[i], padded=True)
+            self.ntrigrams[i] = len(grams)
+            for g in grams:
+                slots.append(self.grams.setdefault(g, len(self.grams)))
+                ids.append(i)
+        slots = np.array(slots, dtype=np.int64)
+        ids   = np.array(ids, dtype=np.int32)
+        if parent is not None:
+            remap = np.array([self.lookup.get(n, -1) for n in parent.names], dtype=np.int32)
+            kept = remap >= 0
+            self.ntrigrams[remap[kept]] = parent.ntrigrams[kept]
+            old_slots = np.repeat(np.arange(len(parent.bounds) - 1), np.diff(parent.bounds))
+            old_ids   = remap[parent.ids]
+            slots = np.concatenate([old_slots[old_ids >= 0], slots])
+            ids   = np.concatenate([old_ids[old_ids >= 0], ids])
+        order = np.lexsort((ids, slots))
+        self.ids    = ids[order]
+        self.bounds = np.searchsorted(slots[order], np.arange(len(self.grams) + 1))
+
+        self._masks = OrderedDict()
+        self._lock  = threading.Lock()
+
+    def restrict(self, names, key=None):
+        """Boolean mask of indexed names present in ``names``; memoized by ``key``."""
+        with self._lock:
+            if key is not None and key in self._masks:
+                return self._masks[key]
+        mask = np.zeros(len(self.names), dtype=bool)
+        mask[[self.lookup[n] for n in names if n in self.lookup]] = True
+        if key is not None:
+            with self._lock:
+                self._masks[key] = mask
+                while len(self._masks) > 32:
+                    self._masks.popitem(last=False)
+        return mask
+
+    def count(self, mask=None):
+        """Number of names allowed by ``mask``."""
+        return len(self.names) if mask is None else int(mask.sum())
+
+    def _posting(self, gram):
+        """Sorted ids of the names containing ``gram`` (None if none ever did)."""
+        slot = self.grams.get(gram)
+        return None if slot is None else self.ids[self.bounds[slot]:self.bounds[slot+1]]
+
+    def _rank(self, ids, q):
+        def tier(i):
+            key = self.keys[i]
+            return (0 if key == q else 1 if key.startswith(q) else 2, len(key), i)
+        return sorted(ids, key=tier)
+
+    def _matches(self, q):
+        if len(q) < 3:
+            lo = bisect_left(self.sorted_keys, q)
+            hi = bisect_left(self.sorted_keys, q + "\U0010ffff")
+            return np.array(self.order[lo:hi], dtype=np.int32)
+        lists = []
+        for g in _trigrams(q):
+            posting = self._posting(g)
+            if posting is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(posting)
+        lists.sort(key=len)
+        ids = lists[0]
+        for other in lists[1:]:
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        return np.array([i for i in ids if q in self.keys[i]], dtype=np.int32)
+
+    def _similar(self, q):
+        grams = [p for p in map(self._posting, _trigrams(q, padded=True)) if p is not None]
+        if not grams:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.names))
+        ids = np.flatnonzero(shared)
+        sim = shared[ids] / (len(_trigrams(q, padded=True)) + self.ntrigrams[ids] - shared[ids])
+        return ids, sim
+
+    def search(self, query, k=MAX_RESULTS, mask=None, fuzzy=True):
+        """Up to ``k`` best-matching names (allowed by ``mask``) for ``query``.
+
+        An empty query gives the first ``k`` allowed names alphabetically; the
+        caller says how many more there are (``count``) and asks to type.
+        """
+        q = fold(query)
+        if not q:
+            ids = np.arange(len(self.names)) if mask is None else np.flatnonzero(mask)
+            return [self.names[i] for i in ids[:k]]
+
+        ids = self._matches(q)
+        if mask is not None:
+            ids = ids[mask[ids]]
+        hits = self._rank(ids.tolist(), q)[:k]
+
+        if fuzzy and len(hits) < k and len(q) >= 3:
+            cand, sim = self._similar(q)
+            keep = sim >= MIN_SIMILARITY
+            if mask is not None:
+                keep &= mask[cand]
+            cand, sim = cand[keep], sim[keep]
+            seen = set(hits)
+            extra = [i for i in cand[np.argsort(-sim, kind="stable")] if i not in seen]
+            hits += extra[:k - len(hits)]
+        return [self.names[i] for i in hits]
+
+
+def _names(df, column):
+    if column == "Investors":
+        from investors import get_investor_index
+        return get_investor_index(df).names
+    if column == "Startup":
+        from startups import get_startup_index
+        return get_startup_index(df).names
+    return df[column].dropna().unique().tolist()
+
+
+# Recent indexes by (version, column), so a frame with appended rows (see
+# data_loader.apply_deltas) extends its parent's index instead of rebuilding.
+_recent = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+@st.cache_resource(max_entries=4)
+def load_search_index(_df, version, column):
+    with _recent_lock:
+        parent = _recent.get((_df.attrs.get("parent"), column))
+    index = SearchIndex(_names(_df, column), parent)
+    with _recent_lock:
+        _recent[(version, column)] = index
+        while len(_recent) > 8:
+            _recent.popitem(last=False)
+    return index
+
+
+def get_search_index(df, column):
+    """Search index over the names in ``column`` of the full loaded frame."""
+    version = df.attrs.get("version")
+    if version is None:
+        return SearchIndex(_names(df, column))
+    return load_search_index(df, version, column)
@@ -0,0 +1,342 @@
+import argparse
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import aggregates as agg
+from aggregates import memoized
+from data_loader import fmt_column
+
+# Approximate aggregates (opt-in): DASH_APPROX=1
+# The rows are summarized once per dataset into mergeable sketches, one per
+# partition (Year x Industry x City x Funding_Round, the grain the sidebar
+# filters select): a HyperLogLog of startup names for distinct counts, deal
+# counts on a fixed log10 grid for the deal-size histogram, the partition's
+# largest deals, and its count / sum / first / last date. A filtered view
+# merges the sketches of the partitions it selects instead of scanning rows.
+# Only the distinct counts are estimates; the histogram is exact on its grid
+# and the top deals are exact (the largest deals overall are among the
+# largest of their partitions).
+#
+# Most partitions hold a handful of deals, so registers and histogram bins
+# are stored sparse: only the non-zero cells of each partition, as
+# (partition, column, value) arrays. A selection is merged into one dense
+# register array / histogram only when it is rolled up.
+APPROX         = os.environ.get("DASH_APPROX", "") == "1"
+PARTITION_DIMS = ["Year", "Industry", "City", "Funding_Round"]
+HLL_P          = 10                           # 2**10 registers per merged estimate
+HLL_M          = 1 << HLL_P
+HLL_RSE        = 1.04 / np.sqrt(HLL_M)        # relative standard error of an estimate
+Z95            = 1.96
+GRID           = np.linspace(0, 12, 481)      # log10 USD, $1 to $1T in 0.025 steps
+TOP_K          = 10
+TOP_COLUMNS    = ["Date", "Startup", "Industry", "City", "Funding_Round", "Investors", "Amount"]
+
+# ``rows`` is the dataset the top deals point into (not held by the sketches).
+Sketches = namedtuple("Sketches", "keys stats hll hist top rows")
+Sparse   = namedtuple("Sparse", "part col value")   # non-zero cells of a partitions x columns matrix
+
+
+def sparse(part, col, value, how):
+    """Cells (part, col) with their values combined by ``how`` ("sum" / "max"), in cell order."""
+    key = part.astype(np.int64) << 16 | col.astype(np.int64)   # col < 2**16
+    cells = pd.Series(value).groupby(key, sort=True).agg(how)
+    key = cells.index.to_numpy()
+    return Sparse((key >> 16).astype(np.int32), (key & 0xFFFF).astype(np.uint16), cells.to_numpy())
+
+
+def _select(sp, mask):
+    """Cells of the partitions in ``mask``, renumbered in mask order."""
+    keep = mask[sp.part]
+    ids = np.cumsum(mask) - 1
+    return Sparse(ids[sp.part[keep]].astype(np.int32), sp.col[keep], sp.value[keep])
+
+
+def _remap(sp, ids):
+    return Sparse(ids[sp.part].astype(np.int32), sp.col, sp.value)
+
+
+def _concat(a, b, how):
+    return sparse(np.concatenate([a.part, b.part]), np.concatenate([a.col, b.col]),
+                  np.concatenate([a.value, b.value]), how)
+
+
+def nbytes(s):
+    """Memory held by sketches ``s`` (without the dataset ``s.rows``)."""
+    frames = sum(int(f.memory_usage(deep=True).sum()) for f in (s.keys, s.stats, s.top))
+    return frames + sum(a.nbytes for sp in (s.hll, s.hist) for a in sp)
+
+
+# HyperLogLog
+def _hash(s):
+    """64-bit hash per value (strings of a categorical are hashed once)."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy()
+        return pd.util.hash_array(np.asarray(s.cat.categories, dtype=object))[codes]
+    return pd.util.hash_array(s.to_numpy(dtype=object))
+
+
+def _bit_length(x):
+    """Bit length of each uint64, exactly (each 32-bit half fits a double)."""
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+def hll_registers(groups, hashes):
+    """Sparse registers of the hashes in each group (only the non-zero ones)."""
+    idx  = (hashes >> np.uint64(64 - HLL_P)).astype(np.int64)
+    # Remaining bits, with a guard bit so a rank never exceeds 64 - HLL_P + 1.
+    rest = (hashes << np.uint64(HLL_P)) | np.uint64(1 << (HLL_P - 1))
+    rank = (65 - _bit_length(rest)).astype(np.uint8)
+    return sparse(groups, idx, rank, "max")
+
+
+def merged_registers(sp, groups=None, n_groups=1):
+    """Dense (n_groups, HLL_M) registers, merging the cells of each group of partitions.
+
+    ``groups`` maps a partition to its group (default: all in one).
+    """
+    g = np.zeros(len(sp.part), dtype=np.int64) if groups is None else groups[sp.part].astype(np.int64)
+    reg = np.zeros(n_groups * HLL_M, dtype=np.uint8)
+    np.maximum.at(reg, g * HLL_M + sp.col, sp.value)
+    return reg.reshape(n_groups, HLL_M)
+
+
+def hll_estimate(registers):
+    """Distinct-count estimate of (merged) registers."""
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+def error_bound(estimate):
+    """95% error bound (+/- distinct values) of an estimate."""
+    return int(np.ceil(Z95 * HLL_RSE * estimate))
+
+
+# Build / merge
+def _grid_bins(amounts):
+    """GRID bin of each positive amount (as np.histogram bins it; ends clipped)."""
+    bins = np.searchsorted(GRID, np.log10(amounts), side="right") - 1
+    return np.clip(bins, 0, len(GRID) - 2)
+
+
+def _keys(keys):
+    """Partition keys with the string dimensions as categoricals."""
+    return keys.astype({c: "category" for c in PARTITION_DIMS if c != "Year"})
+
+
+def _top(rows):
+    """(part, pos, Amount) of the TOP_K largest deals of each partition (ties: first row first)."""
+    rows = rows.sort_values(["part", "Amount", "pos"], ascending=[True, False, True], kind="stable")
+    return rows[rows.groupby("part").cumcount() < TOP_K].reset_index(drop=True)
+
+
+def build_sketches(df, start=0):
+    """Sketches of ``df``; ``start`` is the position of its first row in the dataset."""
+    part = df.groupby(PARTITION_DIMS, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    n = int(part.max()) + 1 if len(df) else 0
+    keys = _keys(df[PARTITION_DIMS].iloc[np.unique(part, return_index=True)[1]].reset_index(drop=True))
+
+    amount = df["Amount"].to_numpy(dtype="float64")
+    dates  = df["Date"].to_numpy()
+    stats = pd.DataFrame({"Deals":  np.bincount(part, minlength=n),
+                          "Amount": np.bincount(part, weights=amount, minlength=n)})
+    by = pd.Series(dates).groupby(part)
+    stats["First"], stats["Last"] = by.min().to_numpy(), by.max().to_numpy()
+
+    nonzero = amount > 0
+    hist = sparse(part[nonzero], _grid_bins(amount[nonzero]),
+                  np.ones(int(nonzero.sum()), dtype=np.int32), "sum")
+
+    top = _top(pd.DataFrame({"part": part.astype(np.int32), "pos": start + np.arange(len(df)),
+                             "Amount": amount}))
+    return Sketches(keys, stats, hll_registers(part, _hash(df["Startup"])), hist, top,
+                    df if start == 0 else None)
+
+
+def merge_sketches(a, b, rows=None):
+    """Sketches of the rows behind both ``a`` and ``b`` (disjoint sets of rows).
+
+    ``rows`` is the dataset holding both (for the top deals).
+    """
+    keys = pd.concat([a.keys, b.keys], ignore_index=True)
+    ids  = keys.groupby(PARTITION_DIMS, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    n    = int(ids.max()) + 1 if len(ids) else 0
+    ia, ib = ids[:len(a.keys)], ids[len(a.keys):]
+
+    stats = pd.concat([a.stats, b.stats], ignore_index=True).groupby(ids).agg(
+        Deals=("Deals", "sum"), Amount=("Amount", "sum"), First=("First", "min"), Last=("Last", "max"))
+    hll  = _concat(_remap(a.hll, ia), _remap(b.hll, ib), "max")
+    hist = _concat(_remap(a.hist, ia), _remap(b.hist, ib), "sum")
+    top = pd.concat([a.top.assign(part=ia[a.top["part"]]), b.top.assign(part=ib[b.top["part"]])],
+                    ignore_index=True)
+    keys = _keys(keys[~pd.Series(ids).duplicated().to_numpy()].reset_index(drop=True))
+    return Sketches(keys, stats.reset_index(drop=True), hll, hist, _top(top), rows)
+
+
+# Recent sketches by version, so appended rows extend their parent's sketches.
+_recent = OrderedDict()
+_lock   = threading.Lock()
+
+
+@st.cache_resource(max_entries=2)
+def load_sketches(_df, version):
+    with _lock:
+        parent = _recent.get(_df.attrs.get("parent"))
+    if parent is None:
+        sketches = build_sketches(_df)
+    else:
+        start = len(_df) - _df.attrs["appended"]
+        sketches = merge_sketches(parent, build_sketches(_df.iloc[start:], start), _df)
+    with _lock:
+        _recent[version] = sketches
+        while len(_recent) > 4:
+            _recent.popitem(last=False)
+    return sketches
+
+
+def get_sketches(df):
+    """Sketches of the full loaded frame, cached by its data version."""
+    version = df.attrs.get("version")
+    return build_sketches(df) if version is None else load_sketches(df, version)
+
+
+def slice_sketches(s, year="All", industry="All", city="All", rounds=None):
+    """The partitions matching a sidebar selection."""
+    m = np.ones(len(s.keys), dtype=bool)
+    if year != "All":      m &= (s.keys["Year"] == year).to_numpy()
+    if industry != "All":  m &= (s.keys["Industry"] == industry).to_numpy()
+    if city != "All":      m &= (s.keys["City"] == city).to_numpy()
+    if rounds is not None: m &= s.keys["Funding_Round"].isin(rounds).to_numpy()
+    top = s.top[m[s.top["part"].to_numpy()]]
+    top = top.assign(part=(np.cumsum(m) - 1)[top["part"].to_numpy()])
+    return Sketches(s.keys[m].reset_index(drop=True), s.stats[m].reset_index(drop=True),
+                    _select(s.hll, m), _select(s.hist, m), top, s.rows)
+
+
+# Roll-ups: same names and result shapes as their aggregates.* counterparts;
+# distinct counts are estimates, with their 95% bound under "*_error" / "*Error".
+@memoized
+def kpis(s):
+    startups = float(hll_estimate(merged_registers(s.hll))[0]) if len(s.keys) else 0.0
+    return {
+        "period_start":   s.stats["First"].min().strftime("%b %Y"),
+        "period_end":     s.stats["Last"].max().strftime("%b %Y"),
+        "records":        int(s.stats["Deals"].sum()),
+        "total_funding":  float(s.stats["Amount"].sum()),
+        "startups":       int(round(startups)),
+        "startups_error": error_bound(startups),
+        "industries":     int(s.keys["Industry"].nunique()),
+        "cities":         int(s.keys["City"].nunique()),
+    }
+
+
+@memoized
+def yoy(s):
+    years = s.keys["Year"].to_numpy()
+    out = s.stats.groupby(years).agg(Total=("Amount", "sum"), Deals=("Deals", "sum"))
+    out["AvgDeal"]  = out["Total"] / out["Deals"]
+    groups = np.searchsorted(out.index.to_numpy(), years)
+    startups = hll_estimate(merged_registers(s.hll, groups, len(out)))
+    out["Startups"] = np.round(startups).astype(np.int64)
+    out["StartupsError"] = [error_bound(e) for e in startups]
+    return out.rename_axis("Year").reset_index()
+
+
+@memoized
+def deal_size_hist(s):
+    """The grid histogram over its occupied range, in at most HIST_BINS bins."""
+    counts = np.bincount(s.hist.col, weights=s.hist.value, minlength=len(GRID) - 1).astype(np.int64)
+    occupied = np.flatnonzero(counts)
+    if not len(occupied):
+        return pd.DataFrame({"lo": [], "hi": [], "count": []})
+    lo, hi = occupied[0], occupied[-1] + 1
+    step = -(-(hi - lo) // agg.HIST_BINS)
+    starts = np.arange(lo, hi, step)
+    return pd.DataFrame({"lo": GRID[starts], "hi": GRID[np.minimum(starts + step, len(GRID) - 1)],
+                         "count": np.add.reduceat(counts[lo:hi], starts - lo)})
+
+
+@memoized
+def top_deals(s):
+    top10 = s.top.sort_values(["Amount", "pos"], ascending=[False, True], kind="stable").head(10)
+    top10 = s.rows[TOP_COLUMNS].iloc[top10["pos"].to_numpy()].copy()
+    top10["Amount_fmt"] = fmt_column(top10["Amount"])
+    top10["Date"] = top10["Date"].dt.date
+    return top10.drop(columns=["Amount"]).rename(columns={"Amount_fmt":"Amount"})
+
+
+# Verification: sketch roll-ups vs. the exact aggregates of the rows
+def check(s, df):
+    """(name, exact, approximate, ok) per value of sketch slice ``s`` against ``df``."""
+    rows = []
+    k, exact = kpis(s), agg.kpis(df)
+    for name, value in exact.items():
+        if name == "startups":
+            ok = abs(k[name] - value) <= k["startups_error"]
+        else:
+            ok = np.isclose(k[name], value) if isinstance(value, float) else k[name] == value
+        rows.append((name, value, k[name], ok))
+
+    y, ey = yoy(s).set_index("Year"), agg.yoy(df).set_index("Year")
+    rows.append(("yoy totals", len(ey), len(y), y.index.equals(ey.index) and
+                 np.allclose(y["Total"], ey["Total"]) and (y["Deals"] == ey["Deals"]).all()))
+    for year in ey.index:
+        rows.append((f"startups {year}", ey.at[year, "Startups"], y.at[year, "Startups"],
+                     abs(y.at[year, "Startups"] - ey.at[year, "Startups"]) <= y.at[year, "StartupsError"]))
+
+    h = deal_size_hist(s)
+    amounts = df.loc[df["Amount"] > 0, "Amount"].to_numpy(dtype="float64")
+    edges = np.append(h["lo"].to_numpy(), h["hi"].to_numpy()[-1:])
+    exact_counts = np.histogram(np.log10(amounts), bins=edges)[0] if len(h) else []
+    rows.append(("deal size histogram", len(amounts), int(h["count"].sum()),
+                 np.array_equal(h["count"].to_numpy(), exact_counts)))
+
+    t, et = top_deals(s), agg.top_deals(df)
+    rows.append(("top deals", len(et), len(t),
+                 t.reset_index(drop=True).astype(str).equals(et.reset_index(drop=True).astype(str))))
+    return pd.DataFrame(rows, columns=["value", "exact", "approximate", "ok"])
+
+
+def main(argv=None):
+    import data_loader
+    import filters
+
+    parser = argparse.ArgumentParser(description="Check sketch roll-ups against exact aggregates.")
+    parser.add_argument("--compact", action="store_true", help="use the compact schema")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every value")
+    args = parser.parse_args(argv)
+
+    df = data_loader.read_dataset(compact_schema=args.compact)
+    index, sketches = filters.FilterIndex(df), build_sketches(df)
+    selections = [{}] + [{"year": y} for y in index.options["Year"]] \
+                      + [{"city": c} for c in df["City"].value_counts().index[:10]] \
+                      + [{"industry": i} for i in df["Industry"].value_counts().index[:10]] \
+                      + [{"rounds": [r]} for r in index.options["Funding_Round"]]
+    failed = 0
+    for sel in selections:
+        rep = check(slice_sketches(sketches, **sel), filters.filter_frame(df, index=index, **sel))
+        bad = rep.loc[~rep["ok"].astype(bool), "value"].tolist()
+        failed += bool(bad)
+        est = rep.set_index("value").loc["startups"]
+        print(f"{sel or 'all'}: {'ok' if not bad else 'MISMATCH ' + ', '.join(bad)} "
+              f"(startups {est['exact']:,} exact, {est['approximate']:,} estimated)")
+        if args.verbose:
+            print(rep.to_string(index=False))
+    print(f"sketches: {len(sketches.keys):,} partitions, {nbytes(sketches) / 2**20:.2f} MB "
+          f"for {len(df):,} deals ({df.memory_usage(deep=True).sum() / 2**20:.2f} MB as a frame)")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
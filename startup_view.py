@@ -1,27 +1,29 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import seaborn as sns
-import io
-from data_loader import fmt
-
-PRIMARY = "#6C63FF"; SECONDARY = "#FF6584"
-
-def _despine(ax):
-    for s in ["top","right"]: ax.spines[s].set_visible(False)
-
-def load_startup_details(df, startup):
+import charts
+import perf
+from charts import chart, PRIMARY
+from data_loader import fmt, fmt_column
+from exports import download_buttons
+from startups import StartupIndex
+from tables import paged_table
+
+@charts.page
+def load_startup_details(df, startup, index=None):
     st.title(f"{startup}")
-    s = df[df["Startup"] == startup].sort_values("Date", ascending=False)
+    if index is None:
+        index = StartupIndex(df)
+    with perf.stage("startup rows") as p:
+        s, k = index.summary(df, startup)
+        p.note(rows=len(s))
 
     if s.empty:
         st.warning("No data available."); return
 
     # KPIs
     c1,c2,c3,c4,c5 = st.columns(5)
-    c1.metric("Total Raised",    fmt(s["Amount"].sum()))
-    c2.metric("Largest Round",   fmt(s["Amount"].max()))
-    c3.metric("Funding Rounds",  len(s))
+    c1.metric("Total Raised",    fmt(k["total"]))
+    c2.metric("Largest Round",   fmt(k["largest"]))
+    c3.metric("Funding Rounds",  k["rounds"])
     c4.metric("Industry",        s["Industry"].iloc[0])
     c5.metric("City",            s["City"].iloc[0])
 
@@ -33,34 +35,27 @@ def load_startup_details(df, startup):
         st.markdown("### Profile")
         st.write(f"**SubVertical:** {s['SubVertical'].iloc[0]}")
         st.write(f"**Funding Category:** {s['Funding_Category'].iloc[0]}")
-        investors = (s["Investors"].str.split(",").explode()
-                      .str.strip().str.strip('"').unique())
+        investors = k["investors"]
         st.markdown(f"**Investors ({len(investors)}):**")
         for inv in investors:
-            if inv and inv.lower() != "undisclosed":
-                st.markdown(f"&nbsp;&nbsp;• {inv}")
+            st.markdown(f"&nbsp;&nbsp;• {inv}")
 
     with col_b:
         st.markdown("### Funding Over Time")
         if len(s) > 1:
-            fig, ax = plt.subplots(figsize=(7,3))
-            ax.bar(s["Date"].dt.strftime("%b %Y"), s["Amount"],
-                   color=PRIMARY, alpha=0.85, edgecolor="white")
-            ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x,_: fmt(x)))
-            plt.xticks(rotation=30, ha="right")
-            _despine(ax)
-            plt.tight_layout()
-            st.pyplot(fig)
+            timeline = s.set_index(s["Date"].dt.strftime("%b %Y"))["Amount"]
+            charts.show(chart("bar", timeline, (7,3), colors=PRIMARY, alpha=0.85,
+                              xrot=30, xha="right", money="y"),
+                        "Funding Over Time")
         else:
             st.info("Only one round on record.")
 
     # Rounds Table
     st.markdown("### Funding Rounds")
-    disp = s[["Date","Funding_Round","InvestmentType","Investors","Amount","Funding_Category"]].copy()
-    disp["Amount"] = disp["Amount"].apply(fmt)
-    disp["Date"]   = disp["Date"].dt.date
-    st.dataframe(disp.reset_index(drop=True), use_container_width=True)
+    paged_table(s[["Date","Funding_Round","InvestmentType","Investors","Amount","Funding_Category"]],
+                "rounds", formats={"Amount": fmt_column, "Date": lambda d: d.dt.date},
+                sort_columns=["Date","Amount"], owner=startup)
+
+    download_buttons(s, f"Export {startup} Data", startup.replace(' ','_'), page="startup")
 
-    buf = io.BytesIO(); s.to_csv(buf, index=False)
-    st.download_button(f" Export {startup} Data", buf.getvalue(),
-                       f"{startup.replace(' ','_')}.csv", "text/csv")
+    charts.show_timings()
@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def canonical(names):
+    """Matching key for startup names: case-folded, quotes, extra spaces and trailing punctuation removed."""
+    return (names.astype(str).str.normalize("NFKC").str.casefold()
+                 .str.replace(r"\s+", " ", regex=True).str.strip(" \"'")
+                 .str.replace(r"[\s.,;:!]+$", "", regex=True))
+
+
+class StartupIndex:
+    """Per-startup row blocks (newest round first) with precomputed KPIs.
+
+    Built once per dataset. Spelling variants that differ only by case,
+    quoting, spacing or trailing punctuation ("Ola", "OLA", "Ola.") form one
+    startup, shown under its most common spelling. Opening a profile then
+    costs O(rounds of that startup) instead of a scan and sort of the frame.
+    Given the index of a ``parent`` frame that ``df`` extends with appended
+    rows, only those rows' names are matched, and only the startups they
+    touch get new KPIs and investor lists.
+    """
+
+    def __init__(self, df, parent=None):
+        start = 0 if parent is None else parent.size
+        self.size = len(df)
+        raw  = df["Startup"].iloc[start:].astype(str).str.strip()
+        keys = canonical(raw)
+
+        counts = pd.DataFrame({"key": keys.to_numpy(), "raw": raw.to_numpy()}).groupby(["key","raw"]).size()
+        if parent is not None:
+            counts = pd.concat([parent.spellings, counts]).groupby(level=["key","raw"]).sum()
+        self.spellings = counts   # rows per (key, spelling)
+        spelling = (counts.reset_index(name="n")
+                      .sort_values(["key","n","raw"], ascending=[True, False, True])
+                      .drop_duplicates("key").set_index("key")["raw"])
+        spelling = spelling.sort_values(kind="stable")
+        self.names  = spelling.tolist()
+        self.keys   = spelling.index.tolist()
+        self.lookup = {name: i for i, name in enumerate(self.names)}
+        self.by_key = dict(zip(self.keys, range(len(self.keys))))
+
+        # Row blocks: grouped by startup, newest first within each block.
+        codes = keys.map(self.by_key).to_numpy()
+        if parent is not None:
+            remap = np.array([self.by_key[k] for k in parent.keys], dtype=np.int64)
+            codes = np.concatenate([remap[parent.codes], codes])
+        dates = df["Date"].to_numpy()
+        self.order  = np.lexsort((-dates.astype("datetime64[ns]").astype(np.int64), codes))
+        self.codes  = codes
+        self.labels = df.index.to_numpy()[self.order]
+        self.bounds = np.searchsorted(codes[self.order], np.arange(len(self.names) + 1))
+
+        # KPIs and investors of the startups the rows from ``start`` on belong to.
+        touched = np.unique(codes[start:])
+        if parent is None:
+            blocks = self.order
+        else:
+            blocks = np.concatenate([self.order[self.bounds[c]:self.bounds[c+1]] for c in touched]
+                                    + [np.empty(0, dtype=np.intp)])
+        amount  = pd.Series(df["Amount"].to_numpy()[blocks])
+        by_code = amount.groupby(codes[blocks])
+        kpis = pd.DataFrame({"total": by_code.sum(), "largest": by_code.max(),
+                             "rounds": by_code.size()}).reindex(touched)
+        if parent is None:
+            self.kpis = kpis.to_dict("index")
+            self.investors = [[] for _ in self.names]
+        else:
+            self.kpis = {code: parent.kpis[old] for old, code in enumerate(remap.tolist())}
+            self.kpis.update(kpis.to_dict("index"))
+            self.investors = [None] * len(self.names)
+            for code, investors in zip(remap.tolist(), parent.investors):
+                self.investors[code] = investors
+
+        # Investor sets in the order they first appear, newest round first.
+        lists = df["Investors"].iloc[blocks].astype(str).to_numpy()
+        at = 0
+        for code in touched.tolist():
+            n = self.bounds[code+1] - self.bounds[code]
+            seen = {}
+            for inv in ",".join(lists[at:at+n]).split(","):
+                inv = inv.strip().strip('"')
+                if inv and inv.lower() != "undisclosed":
+                    seen.setdefault(inv, None)
+            self.investors[code] = list(seen)
+            at += n
+
+        self._names_in = OrderedDict()
+        self._lock = threading.Lock()
+
+    def code(self, name):
+        code = self.lookup.get(name)
+        if code is None:
+            code = self.by_key.get(canonical(pd.Series([name])).iloc[0])
+        return code
+
+    def rows(self, df, name):
+        """Rounds of ``name`` within ``df`` (the indexed frame or a slice of it), newest first."""
+        code = self.code(name)
+        if code is None:
+            return df.iloc[:0]
+        block = slice(self.bounds[code], self.bounds[code+1])
+        if len(df) == self.size:
+            return df.take(self.order[block])
+        pos = df.index.get_indexer(self.labels[block])
+        return df.take(pos[pos >= 0])
+
+    def summary(self, df, name):
+        """(rounds, kpis) of ``name`` within ``df``.
+
+        KPIs are the precomputed ones unless filters hide some of its rounds.
+        """
+        s = self.rows(df, name)
+        code = self.code(name)
+        if code is not None and len(s) == self.kpis[code]["rounds"]:
+            kpis = dict(self.kpis[code], investors=self.investors[code])
+        else:
+            investors = (s["Investors"].astype(str).str.split(",").explode()
+                          .str.strip().str.strip('"').unique())
+            kpis = {"total": s["Amount"].sum(), "largest": s["Amount"].max(), "rounds": len(s),
+                    "investors": [i for i in investors if i and i.lower() != "undisclosed"]}
+        return s, kpis
+
+    def names_in(self, df):
+        """Sorted startup names appearing in ``df``; memoized by its filter key."""
+        if len(df) == self.size:
+            return self.names
+        key = df.attrs.get("filter_key")
+        with self._lock:
+            if key is not None and key in self._names_in:
+                return self._names_in[key]
+        present = np.isin(self.labels, df.index.to_numpy())
+        names = [self.names[c] for c in np.unique(self.codes[self.order][present])]
+        if key is not None:
+            with self._lock:
+                self._names_in[key] = names
+                while len(self._names_in) > 32:
+                    self._names_in.popitem(last=False)
+        return names
+
+
+# Recent indexes by version, so a frame with appended rows (see
+# data_loader.apply_deltas) extends its parent's index instead of rebuilding.
+_recent = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+@st.cache_resource(max_entries=2)
+def load_startup_index(_df, version):
+    with _recent_lock:
+        parent = _recent.get(_df.attrs.get("parent"))
+    index = StartupIndex(_df, parent)
+    with _recent_lock:
+        _recent[version] = index
+        while len(_recent) > 4:
+            _recent.popitem(last=False)
+    return index
+
+
+def get_startup_index(df):
+    """Startup index for the full loaded frame, cached by its data version."""
+    version = df.attrs.get("version")
+    return StartupIndex(df) if version is None else load_startup_index(df, version)
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import streamlit as st
+
+import perf
+
+# Paged tables for slices that can run to many thousands of rows. Sorting is
+# done here on the raw (numeric / datetime) columns, then only the visible page
+# is formatted and sent to the browser, so a page costs the same whatever the
+# size of the slice.
+PAGE_SIZE = 50
+
+
+def page_rows(df, sort_by=None, descending=False, page=1, page_size=PAGE_SIZE):
+    """Rows of ``df`` on ``page`` (1-based) after a stable sort on ``sort_by``."""
+    start = (page - 1) * page_size
+    if sort_by is None:
+        return df.iloc[start:start + page_size]
+    col = df[sort_by]
+    values = col.to_numpy(dtype="int64") if col.dtype.kind == "M" else col.to_numpy(dtype="float64")
+    missing = np.isnan(values) if values.dtype.kind == "f" else (values == np.iinfo(np.int64).min)
+    order = np.argsort(-values if descending else values, kind="stable")
+    order = np.concatenate([order[~missing[order]], order[missing[order]]])   # missing last
+    return df.iloc[order[start:start + page_size]]
+
+
+def paged_table(df, key, formats=None, sort_columns=(), owner=None, page_size=PAGE_SIZE):
+    """Show ``df`` a page at a time.
+
+    ``formats`` maps a column to a function applied to the visible page of it;
+    ``sort_columns`` are the columns offered for sorting; the page goes back to
+    the first one when ``owner`` (e.g. the startup shown) changes.
+    """
+    n = len(df)
+    pages = max(1, math.ceil(n / page_size))
+    state = st.session_state
+    if state.get(f"{key}_owner") != owner or state.get(f"{key}_page", 1) > pages:
+        state[f"{key}_owner"], state[f"{key}_page"] = owner, 1
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    sort_by = c1.selectbox("Sort by", ["(as listed)", *sort_columns], key=f"{key}_sort")
+    descending = c2.toggle("Descending", value=True, key=f"{key}_desc")
+    page = c3.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1,
+                           key=f"{key}_page")
+
+    with perf.stage(f"table {key}", rows=n):
+        rows = page_rows(df, None if sort_by == "(as listed)" else sort_by,
+                         descending, page, page_size)
+        view = rows.copy()
+        for col, f in (formats or {}).items():
+            view[col] = f(view[col])
+        start = (page - 1) * page_size
+        view.index = range(start + 1, start + len(view) + 1)
+    st.dataframe(view, use_container_width=True)
+    st.caption(f"Rows {start + 1:,}–{start + len(view):,} of {n:,}" if n else "No rows")
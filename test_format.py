@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from data_loader import fmt, fmt_column
+
+# fmt_column() against fmt(), its scalar reference.
+
+EDGES = [0, 1, 999, 999.5, 999.99, 1000, 1499, 1500, 2500, 12.5, 999499, 999500, 999999,
+         1e6, 1049999, 1050000, 2.35e6, 2.45e6, 999999999, 9.995e8, 1e9, 1.005e9, 1.015e9,
+         3.9e9, 123456789012, 1e15, -5000, np.nan, np.inf]
+
+
+def check(values, index=None):
+    got = fmt_column(pd.Series(values, index=index))
+    assert got.dtype == "str"
+    assert (got.index == pd.Series(values, index=index).index).all()
+    assert got.tolist() == [fmt(v) for v in values]
+
+
+def test_edges():
+    check(EDGES, index=range(100, 100 + len(EDGES)))
+
+
+def test_random_amounts():
+    rng = np.random.default_rng(0)
+    check(rng.integers(0, 5e10, 50_000).astype(float))
+    check(np.round(rng.uniform(0, 1e10, 50_000), -4))   # many exact halves
+    check(np.round(rng.uniform(0, 1e7, 5_000), 2))      # cents
+
+
+def test_one_slow_row():
+    check([2.45e6, 1e6, 5e6])
+    check([2.45e6])
+
+
+def test_empty():
+    assert fmt_column(pd.Series([], dtype="float64")).empty
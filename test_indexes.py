@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader
+from filters import FilterIndex
+from investors import InvestorIndex
+from search import SearchIndex
+from startups import StartupIndex
+
+# Indexes extended from a parent frame (appended delta rows) equal fresh builds.
+
+
+@pytest.fixture(scope="module")
+def df(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("snapshot")
+    df = data_loader.read_dataset(snapshot_dir=str(tmp), delta_dir=str(tmp / "deltas"))
+    # New names, a new city and new investors in the appended rows.
+    tail = df.sample(300, random_state=0).reset_index(drop=True)
+    tail.loc[:49, "Startup"] = tail.loc[:49, "Startup"].astype(str) + " Labs"
+    tail.loc[:9, "City"] = "Atlantis"
+    tail.loc[:9, "Investors"] = "Brand New Capital, sequoia capital india"
+    return pd.concat([df, tail], ignore_index=True)
+
+
+def same(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray):
+        return np.array_equal(a, b, equal_nan=a.dtype.kind == "f")
+    if isinstance(a, (pd.Series, pd.DataFrame)):
+        return a.equals(b)
+    return a == b or (a != a and b != b)
+
+
+@pytest.mark.parametrize("cls", [FilterIndex, StartupIndex, InvestorIndex])
+@pytest.mark.parametrize("appended", [0, 1, 300, 3000])
+def test_extended_equals_fresh(df, cls, appended):
+    fresh = cls(df)
+    extended = cls(df, cls(df.iloc[:len(df) - appended]))
+    for name, value in vars(fresh).items():
+        if not name.startswith("_"):
+            assert same(value, vars(extended)[name]), name
+
+
+@pytest.mark.parametrize("appended", [1, 300, 3000])
+def test_extended_search(df, appended):
+    names = StartupIndex(df).names
+    fresh = SearchIndex(names)
+    extended = SearchIndex(names, SearchIndex(StartupIndex(df.iloc[:len(df) - appended]).names))
+    assert fresh.names == extended.names and fresh.keys == extended.keys
+    for gram in fresh.grams:
+        assert np.array_equal(fresh._posting(gram), extended._posting(gram))
+    for query in ["", "labs", "ola", "byju", "swiggy", "xyz"]:
+        assert fresh.search(query) == extended.search(query)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from search import MAX_RESULTS, SearchIndex
+
+# Type-ahead results stay short enough for a selectbox.
+
+NAMES = [f"Startup {i:04d}" for i in range(500)] + ["BYJU’S", "Byju Classes", "Zomato", "Swiggy"]
+
+
+def test_empty_query_is_capped():
+    index = SearchIndex(NAMES)
+    for query in ("", "  ", "’"):
+        names = index.search(query)
+        assert len(names) == MAX_RESULTS
+        assert names == sorted(NAMES)[:MAX_RESULTS]
+    assert len(index.search("", k=5)) == 5
+
+
+def test_empty_query_respects_mask():
+    index = SearchIndex(NAMES)
+    mask = np.zeros(len(index.names), dtype=bool)
+    mask[::7] = True
+    names = index.search("", mask=mask)
+    assert len(names) <= MAX_RESULTS
+    assert all(mask[index.lookup[n]] for n in names)
+    assert index.count(mask) == mask.sum() > len(names)
+
+
+def test_ranked_matches():
+    index = SearchIndex(NAMES)
+    assert index.search("byjus")[0] == "BYJU’S"
+    assert index.search("byju")[:2] == ["BYJU’S", "Byju Classes"]
+    assert len(index.search("startup")) == MAX_RESULTS
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import data_loader
+import filters
+import sketches as sk
+
+# Accuracy and size of the approximate mode's sketches on StartUp.csv.
+
+
+@pytest.fixture(scope="module")
+def df(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("snapshot")
+    return data_loader.read_dataset(snapshot_dir=str(tmp), delta_dir=str(tmp / "deltas"))
+
+
+@pytest.fixture(scope="module")
+def sketches(df):
+    return sk.build_sketches(df)
+
+
+def selections(df):
+    index = filters.FilterIndex(df)
+    return [{}] + [{"year": y} for y in index.options["Year"]] \
+                + [{"city": c} for c in df["City"].value_counts().index[:10]] \
+                + [{"industry": i} for i in df["Industry"].value_counts().index[:10]] \
+                + [{"rounds": [r]} for r in index.options["Funding_Round"]]
+
+
+def test_smaller_than_frame(df, sketches):
+    assert sk.nbytes(sketches) < df.memory_usage(deep=True).sum() / 4
+
+
+def test_rollups_within_bounds(df, sketches):
+    index = filters.FilterIndex(df)
+    for sel in selections(df):
+        rep = sk.check(sk.slice_sketches(sketches, **sel), filters.filter_frame(df, index=index, **sel))
+        assert rep["ok"].astype(bool).all(), (sel, rep[~rep["ok"].astype(bool)])
+
+
+def test_distinct_count_error(df, sketches):
+    # Each estimate is within its 95% bound (checked above); all of them together
+    # must not drift either: their mean relative error stays near the RSE.
+    index = filters.FilterIndex(df)
+    errors = []
+    for sel in selections(df):
+        exact = filters.filter_frame(df, index=index, **sel)["Startup"].nunique()
+        estimate = sk.kpis(sk.slice_sketches(sketches, **sel))["startups"]
+        errors.append(abs(estimate - exact) / exact)
+    assert max(errors) <= sk.Z95 * sk.HLL_RSE
+    assert np.mean(errors) <= sk.HLL_RSE
+
+
+def test_merge_matches_build(df, sketches):
+    start = len(df) // 2
+    merged = sk.merge_sketches(sk.build_sketches(df.iloc[:start]),
+                               sk.build_sketches(df.iloc[start:], start), df)
+    for sel in selections(df):
+        a, b = sk.slice_sketches(sketches, **sel), sk.slice_sketches(merged, **sel)
+        assert sk.kpis(a) == sk.kpis(b)
+        assert sk.yoy(a).equals(sk.yoy(b))
+        assert sk.deal_size_hist(a).equals(sk.deal_size_hist(b))
+        assert sk.top_deals(a).equals(sk.top_deals(b))
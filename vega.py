@@ -0,0 +1,230 @@
+import pandas as pd
+
+from charts import COLORS, DECORATIONS, PRIMARY, SECONDARY
+from data_loader import fmt
+
+# Vega-Lite versions of the chart kinds in charts.DRAWERS. A spec carries only
+# the chart's aggregate (a few dozen rows), the browser draws it, and neither
+# matplotlib nor seaborn is imported. Each builder returns (data, spec) where
+# the spec's first layer (or the spec itself) holds the "x" and "y" encodings
+# that the decorations (titles, money axes, label rotation) apply to.
+
+PX_PER_INCH = 60
+# Axis labels in the same form as data_loader.fmt ($1.23B, $4.5M, $67K, $890).
+MONEY = ("datum.value >= 1e9 ? '$' + format(datum.value / 1e9, '.2f') + 'B' : "
+         "datum.value >= 1e6 ? '$' + format(datum.value / 1e6, '.1f') + 'M' : "
+         "datum.value >= 1e3 ? '$' + format(datum.value / 1e3, '.0f') + 'K' : "
+         "'$' + format(datum.value, ',.0f')")
+
+
+def _series(s):
+    return pd.DataFrame({"label": [str(i) for i in s.index], "value": s.to_numpy()})
+
+
+def _palette(labels, colors, default=PRIMARY):
+    """Mark colour, or a per-category colour encoding when ``colors`` is a list."""
+    if colors is None or isinstance(colors, str):
+        return {"color": colors or default}, {}
+    colors = list(colors)
+    return {}, {"color": {"field": "label", "type": "nominal", "legend": None,
+                          "scale": {"domain": list(labels),
+                                    "range": [colors[i % len(colors)] for i in range(len(labels))]}}}
+
+
+def _bar(s, colors=None, alpha=None, label_size=None, label_pad=1.01):
+    d = _series(s)
+    d["text"] = [fmt(v) for v in d["value"]]
+    mark, color = _palette(d["label"], colors)
+    bars = {"mark": {"type": "bar", "opacity": alpha or 1, **mark},
+            "encoding": {"x": {"field": "label", "type": "nominal", "sort": None},
+                         "y": {"field": "value", "type": "quantitative"},
+                         "tooltip": [{"field": "label"}, {"field": "text", "title": "value"}],
+                         **color}}
+    layers = [bars]
+    if label_size:
+        layers.append({"mark": {"type": "text", "dy": -6, "fontSize": label_size,
+                                "fontWeight": "bold"},
+                       "encoding": {"x": {"field": "label", "type": "nominal", "sort": None},
+                                    "y": {"field": "value", "type": "quantitative"},
+                                    "text": {"field": "text"}}})
+    return d, {"layer": layers}
+
+
+def _barh(s, color=None, alpha=None, height=0.5, value_fmt=None, invert=False):
+    d = _series(s)
+    # matplotlib draws the first bar at the bottom unless the axis is inverted.
+    order = list(d["label"]) if invert else list(d["label"])[::-1]
+    mark, colors = _palette(d["label"], color)
+    enc = {"y": {"field": "label", "type": "nominal", "sort": order},
+           "x": {"field": "value", "type": "quantitative"}}
+    layers = [{"mark": {"type": "bar", "opacity": alpha or 1, **mark},
+               "encoding": {**enc, "tooltip": [{"field": "label"}, {"field": "value"}], **colors}}]
+    if value_fmt:
+        d["text"] = [value_fmt.format(v) for v in d["value"]]
+        layers.append({"mark": {"type": "text", "align": "left", "dx": 3, "fontSize": 10,
+                                "fontWeight": "bold"},
+                       "encoding": {**enc, "text": {"field": "text"}}})
+    return d, {"layer": layers}
+
+
+def _pie(s, colors=None, pct_size=None):
+    d = _series(s)
+    d["share"] = d["value"] / d["value"].sum()
+    _, color = _palette(d["label"], colors or COLORS)
+    color["color"]["legend"] = {"title": None}
+    return d, {"mark": {"type": "arc"},
+               "encoding": {"theta": {"field": "value", "type": "quantitative", "stack": True},
+                            "order": {"field": "value", "sort": "descending"},
+                            "tooltip": [{"field": "label"},
+                                        {"field": "share", "format": ".1%"}], **color}}
+
+
+def _hist(d, color=PRIMARY):
+    return d, {"mark": {"type": "bar", "color": color, "opacity": 0.8, "stroke": "white"},
+               "encoding": {"x": {"field": "lo", "type": "quantitative", "bin": {"binned": True}},
+                            "x2": {"field": "hi"},
+                            "y": {"field": "count", "type": "quantitative"}}}
+
+
+def _dual(d, x, left, right, left_kind="area", right_kind="bar",
+          left_color=PRIMARY, right_color=SECONDARY, left_label=None, right_label=None,
+          right_ylabel=None, annotate=False, legend=False):
+    d = d[[x, left, right]].copy()
+    d[x] = d[x].astype(str)
+    X = {"field": x, "type": "ordinal"}
+    if left_kind == "area":
+        lhs = [{"mark": {"type": "area", "color": left_color, "opacity": 0.18}},
+               {"mark": {"type": "line", "color": left_color, "strokeWidth": 2.5,
+                         "point": {"color": left_color, "size": 60}}}]
+    else:
+        lhs = [{"mark": {"type": "bar", "color": left_color, "opacity": 0.8}}]
+    for layer in lhs:
+        layer["encoding"] = {"x": X, "y": {"field": left, "type": "quantitative",
+                                           "title": left_label}}
+    if annotate:
+        d["text"] = [fmt(v) for v in d[left]]
+        lhs.append({"mark": {"type": "text", "dy": -12, "fontWeight": "bold", "color": left_color},
+                    "encoding": {"x": X, "y": {"field": left, "type": "quantitative"},
+                                 "text": {"field": "text"}}})
+    rhs = {"mark": ({"type": "bar", "color": right_color, "opacity": 0.2} if right_kind == "bar"
+                    else {"type": "line", "color": right_color, "point": True}),
+           "encoding": {"x": X, "y": {"field": right, "type": "quantitative",
+                                      "title": right_ylabel,
+                                      "axis": {"titleColor": right_color, "orient": "right"}}}}
+    return d, {"layer": [{"layer": lhs}, rhs] if len(lhs) > 1 else [*lhs, rhs],
+               "resolve": {"scale": {"y": "independent"}}}
+
+
+def _grouped_bar(d, x, series, width=0.35):
+    labels = [label for _, label, _ in series]
+    long = d[[x, *[col for col, _, _ in series]]].melt(id_vars=x, var_name="series", value_name="value")
+    long[x] = long[x].astype(str)
+    long["series"] = long["series"].map({col: label for col, label, _ in series})
+    return long, {"mark": {"type": "bar", "opacity": 0.85},
+                  "encoding": {"x": {"field": x, "type": "ordinal"},
+                               "xOffset": {"field": "series", "sort": labels},
+                               "y": {"field": "value", "type": "quantitative"},
+                               "color": {"field": "series", "type": "nominal", "sort": labels,
+                                         "legend": {"title": None, "orient": "top-left"},
+                                         "scale": {"domain": labels,
+                                                   "range": [color for _, _, color in series]}}}}
+
+
+def _stacked_bar(d, legend_title=None):
+    x = d.index.name or "index"
+    long = d.reset_index().melt(id_vars=x, var_name="stack", value_name="value")
+    long[x] = long[x].astype(str)
+    long["stack"] = long["stack"].astype(str)
+    stacks = [str(c) for c in d.columns]
+    return long, {"mark": {"type": "bar", "opacity": 0.9},
+                  "encoding": {"x": {"field": x, "type": "ordinal"},
+                               "y": {"field": "value", "type": "quantitative", "stack": True},
+                               "color": {"field": "stack", "type": "nominal", "sort": stacks,
+                                         "legend": {"title": legend_title},
+                                         "scale": {"domain": stacks,
+                                                   "range": COLORS[:len(stacks)]}}}}
+
+
+def _area(s, color=PRIMARY, marker=None, categorical=False):
+    if categorical or not pd.api.types.is_datetime64_any_dtype(s.index):
+        d, x = _series(s), {"field": "label", "type": "ordinal", "sort": None}
+    else:
+        d = pd.DataFrame({"label": s.index, "value": s.to_numpy()})
+        x = {"field": "label", "type": "temporal"}
+    enc = {"x": x, "y": {"field": "value", "type": "quantitative"}}
+    line = {"type": "line", "color": color, "strokeWidth": 2}
+    if marker:
+        line["point"] = {"color": color}
+    return d, {"layer": [{"mark": {"type": "area", "color": color, "opacity": 0.2}, "encoding": enc},
+                         {"mark": line, "encoding": enc}]}
+
+
+def _bubble(d, x, y, size, label, size_scale=1e-4):
+    d = d[[x, y, size, label]].copy()
+    d[label] = d[label].astype(str)
+    d["area"] = d[size] * size_scale
+    enc = {"x": {"field": x, "type": "quantitative"}, "y": {"field": y, "type": "quantitative"}}
+    return d, {"layer": [
+        {"mark": {"type": "circle", "opacity": 0.75, "stroke": "white", "strokeWidth": 1},
+         "encoding": {**enc, "size": {"field": "area", "type": "quantitative",
+                                      "scale": {"type": "identity"}},
+                      "color": {"field": label, "type": "nominal", "legend": None,
+                                "scale": {"scheme": "viridis"}},
+                      "tooltip": [{"field": label}, {"field": x}, {"field": y}, {"field": size}]}},
+        {"mark": {"type": "text", "dy": -8, "fontSize": 9}, "encoding": {**enc, "text": {"field": label}}},
+    ]}
+
+
+def _heatmap(d, scale=1, cbar_label=None):
+    rows, cols = d.index.name or "row", d.columns.name or "column"
+    long = (d / scale).rename_axis(index=rows, columns=cols).stack().rename("value").reset_index()
+    long[rows], long[cols] = long[rows].astype(str), long[cols].astype(str)
+    enc = {"x": {"field": cols, "type": "ordinal"},
+           "y": {"field": rows, "type": "ordinal", "sort": [str(i) for i in d.index]}}
+    return long, {"layer": [
+        {"mark": {"type": "rect", "stroke": "white", "strokeWidth": 0.5},
+         "encoding": {**enc, "color": {"field": "value", "type": "quantitative",
+                                       "scale": {"scheme": "yelloworangered"},
+                                       "legend": {"title": cbar_label}}}},
+        {"mark": {"type": "text", "fontSize": 9},
+         "encoding": {**enc, "text": {"field": "value", "format": ".0f"}}},
+    ]}
+
+
+BUILDERS = {
+    "bar": _bar, "barh": _barh, "pie": _pie, "hist": _hist, "dual": _dual,
+    "grouped_bar": _grouped_bar, "stacked_bar": _stacked_bar, "area": _area,
+    "bubble": _bubble, "heatmap": _heatmap,
+}
+
+
+def _decorate(spec, title=None, title_style=None, xlabel=None, ylabel=None,
+              money=None, xrot=None, xha=None, xsize=None):
+    enc = spec
+    while "layer" in enc:
+        enc = enc["layer"][0]
+    enc = enc.get("encoding", {})
+    for axis, label in (("x", xlabel), ("y", ylabel)):
+        if axis not in enc:
+            continue
+        enc[axis].setdefault("title", label or None)
+        props = enc[axis].setdefault("axis", {})
+        if money == axis:
+            props["labelExpr"] = MONEY
+        if axis == "x":
+            if xrot is not None:
+                props["labelAngle"] = -xrot
+            if xsize is not None:
+                props["labelFontSize"] = xsize
+    if title is not None:
+        style = title_style or {}
+        spec["title"] = {"text": title, "fontSize": style.get("fontsize", 13),
+                         "color": style.get("color", "black")}
+
+
+def spec(c):
+    """(data, Vega-Lite spec) for chart ``c``."""
+    data, out = BUILDERS[c.kind](c.data, **{k: v for k, v in c.opts.items() if k not in DECORATIONS})
+    _decorate(out, **{k: v for k, v in c.opts.items() if k in DECORATIONS})
+    out["height"] = int(c.figsize[1] * PX_PER_INCH)
+    return data, out
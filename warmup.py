@@ -0,0 +1,62 @@
+import importlib
+import threading
+import time
+
+import streamlit as st
+
+# Cold-start work moved off the first page view. app.py imports only what the
+# sidebar needs; each page imports its modules when it is first shown. The
+# first script run of a server process also starts a background thread that
+# imports the page modules and fills the data caches and every index the pages
+# read: filters, cube, startup and investor indexes, investor graph and the two
+# search indexes. A refresh builds the same set for a new version. Cached
+# loaders compute a value once, so a request arriving mid-warm-up waits for
+# that computation instead of repeating it.
+PAGE_MODULES = ["analysis", "report", "startup_view", "investor_view", "search"]
+
+
+def warm_caches(df):
+    """Build the derived structures of the full frame ``df`` (cached by its version)."""
+    from cube import get_cube
+    from filters import get_filter_index
+    from investors import get_investor_graph, get_investor_index
+    from search import get_search_index
+    from sketches import APPROX, get_sketches
+    from startups import get_startup_index
+    get_filter_index(df)
+    get_cube(df)
+    get_startup_index(df)
+    get_investor_index(df)
+    get_investor_graph(df)
+    get_search_index(df, "Startup")
+    get_search_index(df, "Investors")
+    if APPROX:
+        get_sketches(df)
+
+
+def _warm(timings):
+    import charts
+    if charts.RENDER_PROCESSES:
+        t0 = time.perf_counter()
+        charts.start_pool()
+        timings["render pool"] = time.perf_counter() - t0
+    # Imports first: meanwhile the first request is loading the data itself.
+    for name in PAGE_MODULES:
+        t0 = time.perf_counter()
+        importlib.import_module(name)
+        timings[f"import {name}"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    import refresh
+    df = refresh.load()   # the same cache entry as app.py's unfiltered load
+    timings["load_data"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    warm_caches(df)
+    timings["indexes"] = time.perf_counter() - t0
+
+
+@st.cache_resource
+def start():
+    """Start the warm-up once per server process; returns its step timings (seconds)."""
+    timings = {}
+    threading.Thread(target=_warm, args=(timings,), name="dash-warmup", daemon=True).start()
+    return timings